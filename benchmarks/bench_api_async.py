@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+异步API爬虫吞吐量基准 - 使用本地模拟接口对比同步与不同并发数的异步爬取
+使用方法:
+  python benchmarks/bench_api_async.py --pages 40 --latency 0.05
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.api_spider import ApiSpider
+from core.async_api_spider import AsyncApiSpider
+from core.base_spider import SpiderConfig
+
+
+def make_handler(pages: int, page_size: int, latency: float):
+    """模拟分页接口：/list?page=N 返回列表，/detail?id=N 返回详情"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            parsed = urlparse(self.path)
+            query = parse_qs(parsed.query)
+            if parsed.path == '/detail':
+                body = {'id': query['id'][0], 'content': f"详情 {query['id'][0]}"}
+            else:
+                page = int(query.get('page', ['1'])[0])
+                items = []
+                if page <= pages:
+                    start = (page - 1) * page_size
+                    items = [
+                        {'id': i, 'title': f'标题 {i}', '_detail_url': f"http://{self.headers['Host']}/detail?id={i}"}
+                        for i in range(start, start + page_size)
+                    ]
+                body = {'data': items}
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def run(spider_cls, base_url: str, pages: int, concurrent: int):
+    config = SpiderConfig(
+        name='bench', mode='api', base_url=f'{base_url}/list', delay=0, max_pages=pages,
+        concurrent=concurrent,
+        list_page={'list_selector': 'data', 'fields': [
+            {'name': 'id', 'selector': 'id'},
+            {'name': 'title', 'selector': 'title'},
+            {'name': '_detail_url', 'selector': '_detail_url'},
+        ]},
+        detail_page={'fields': [{'name': 'content', 'selector': 'content'}]},
+        pagination={'param': 'page', 'size_param': ''},
+    )
+    spider = spider_cls(config)
+    start = time.perf_counter()
+    spider.crawl()
+    return len(spider.results), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='异步API爬虫吞吐量基准')
+    parser.add_argument('--pages', type=int, default=20, help='列表页数量')
+    parser.add_argument('--page-size', type=int, default=5, help='每页条数')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟接口延迟(秒)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='异步并发数')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.pages, args.page_size, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    try:
+        count, elapsed = run(ApiSpider, base_url, args.pages + 1, 1)
+        print(f"{'sync':<10} {count:>6} items  {elapsed:>7.2f} s  {count / elapsed:>8.1f} items/s")
+        for concurrency in args.concurrency:
+            count, elapsed = run(AsyncApiSpider, base_url, args.pages + 1, concurrency)
+            print(f"{'async x' + str(concurrency):<10} {count:>6} items  {elapsed:>7.2f} s  {count / elapsed:>8.1f} items/s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
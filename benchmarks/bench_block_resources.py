@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+资源拦截基准 - 对比拦截前后每个页面的传输字节数与加载耗时
+需要本机安装 Chrome。
+使用方法:
+  python benchmarks/bench_block_resources.py -c configs/jd_iphone16.json --pages 5
+  python benchmarks/bench_block_resources.py --url https://search.jd.com/Search?keyword=iPhone16 --types image font tracker
+"""
+
+import argparse
+import logging
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.base_spider import SpiderConfig
+from core.browser_spider import BrowserSpider
+from utils.logger import setup_logger
+from utils.resource_blocker import DEFAULT_TYPES
+
+
+def measure(config: SpiderConfig, urls, rounds: int):
+    """依次加载页面，返回 (每页传输KB, 每页耗时ms, 每页拦截请求数)"""
+    spider = BrowserSpider(config)
+    spider._setup_driver()
+    try:
+        elapsed = 0.0
+        for _ in range(rounds):
+            for url in urls:
+                start = time.perf_counter()
+                spider._get(url)
+                elapsed += time.perf_counter() - start
+    finally:
+        spider._release_driver()
+    pages = spider.stats.get('pages_measured') or 1
+    return (spider.stats.get('bytes_transferred') / 1024 / pages, elapsed * 1000 / pages,
+            spider.stats.get('requests_blocked') / pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='资源拦截性能基准')
+    parser.add_argument('-c', '--config', help='配置文件路径，使用其 base_url 与分页参数')
+    parser.add_argument('--url', action='append', help='测试页面，可重复指定')
+    parser.add_argument('--pages', type=int, default=3, help='按配置分页生成的页面数')
+    parser.add_argument('--types', nargs='*', default=list(DEFAULT_TYPES), help='拦截的资源类型')
+    parser.add_argument('--rounds', type=int, default=1, help='执行轮数')
+    args = parser.parse_args()
+
+    setup_logger(level=logging.WARNING)
+
+    if args.config:
+        config = SpiderConfig.from_json(args.config)
+    elif args.url:
+        config = SpiderConfig(name='bench', mode='browser', base_url=args.url[0])
+    else:
+        parser.error("需要指定 -c 或 --url")
+
+    urls = list(args.url or [])
+    if not urls:
+        param = (config.pagination or {}).get('param', 'page')
+        separator = '&' if '?' in config.base_url else '?'
+        urls = [config.base_url] + [f"{config.base_url}{separator}{param}={n}" for n in range(2, args.pages + 1)]
+
+    # 不拦截任何资源时仍统计传输量，作为对照
+    config = replace(config, cookies_file=None, driver_pool={'enabled': False})
+    baseline = measure(replace(config, block_resources={'types': []}), urls, args.rounds)
+    blocked = measure(replace(config, block_resources={'types': args.types}), urls, args.rounds)
+
+    print(f"{len(urls)} pages x {args.rounds} rounds, blocking: {', '.join(args.types)}")
+    print(f"baseline {baseline[0]:>10,.1f} KB/page {baseline[1]:>8,.0f} ms/page")
+    print(f"blocked  {blocked[0]:>10,.1f} KB/page {blocked[1]:>8,.0f} ms/page  ({blocked[2]:.1f} requests blocked/page)")
+    print(f"saved    {baseline[0] - blocked[0]:>10,.1f} KB/page {baseline[1] - blocked[1]:>8,.0f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
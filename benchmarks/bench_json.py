@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+JSON编解码基准 - 对比标准库 json 与 orjson 在输出和响应解析上的吞吐量
+使用方法:
+  pip install orjson
+  python benchmarks/bench_json.py --items 100000 --rounds 3
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.json_codec import JsonCodec, orjson
+
+
+def build_records(count: int):
+    """生成商品列表结构的测试记录"""
+    return [
+        {
+            'title': f'Apple iPhone 16 Pro 256GB 沙漠色钛金属 {i}',
+            'price': f'{7999 + i % 500}.00',
+            'shop': f'京东自营旗舰店 {i % 50}',
+            'url': f'https://item.jd.com/{100000 + i}.html',
+            'image': f'https://img.jd.com/n1/{i}.jpg',
+            'comments': i * 13 % 100000,
+            'tags': ['自营', '放心购', f'tag{i % 7}'],
+        }
+        for i in range(count)
+    ]
+
+
+def write_json(codec: JsonCodec, records):
+    """JsonWriter 的写法：每条记录缩进编码"""
+    out = io.StringIO()
+    for record in records:
+        out.write(codec.dumps(record, indent=True))
+    return out.tell()
+
+
+def write_jsonl(codec: JsonCodec, records):
+    """JsonLinesWriter 的写法：每条记录编码为一行字节"""
+    out = io.BytesIO()
+    for record in records:
+        out.write(codec.dumps_bytes(record) + b'\n')
+    return out.tell()
+
+
+def parse_pages(codec: JsonCodec, pages):
+    """ApiSpider 的写法：解析每页响应正文"""
+    return sum(len(codec.loads(page)['data']) for page in pages)
+
+
+def measure(name: str, func, count: int, rounds: int) -> float:
+    """多轮执行取最好成绩"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<16} {count / best:>12,.0f} items/s  ({best * 1000:.1f} ms)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON编解码性能基准')
+    parser.add_argument('--items', type=int, default=100000, help='记录数量')
+    parser.add_argument('--page-size', type=int, default=50, help='每页响应的记录数')
+    parser.add_argument('--rounds', type=int, default=3, help='执行轮数')
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("未安装 orjson，只测量标准库: pip install orjson")
+    backends = ['json'] + (['orjson'] if orjson is not None else [])
+
+    records = build_records(args.items)
+    size = args.page_size
+    pages = [
+        JsonCodec('json').dumps({'code': 0, 'data': records[i:i + size]}).encode('utf-8')
+        for i in range(0, len(records), size)
+    ]
+
+    timings = {}
+    for backend in backends:
+        codec = JsonCodec(backend)
+        timings[backend] = (
+            measure(f'{backend} json', lambda: write_json(codec, records), args.items, args.rounds),
+            measure(f'{backend} jsonl', lambda: write_jsonl(codec, records), args.items, args.rounds),
+            measure(f'{backend} parse', lambda: parse_pages(codec, pages), args.items, args.rounds),
+        )
+
+    if 'orjson' in timings:
+        speedups = [base / fast for base, fast in zip(timings['json'], timings['orjson'])]
+        print("speedup          json {:.1f}x  jsonl {:.1f}x  parse {:.1f}x".format(*speedups))
+
+
+if __name__ == "__main__":
+    main()
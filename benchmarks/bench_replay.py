@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+重放基准 - 用录制的页面存档作为固定语料，测量离线提取的吞吐量
+使用方法:
+  python main.py -c configs/jd_iphone16.json --record archive/
+  python benchmarks/bench_replay.py -c configs/jd_iphone16.json --replay archive/ --rounds 5
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.spider_factory import SpiderFactory
+from utils.logger import setup_logger
+
+
+def run_once(config_path: str, archive_dir: str):
+    """从存档完整重放一次，返回 (记录数, 耗时, 重放页面数)"""
+    spider = SpiderFactory.create_spider(config_path)
+    spider.open_archive(archive_dir, replay=True)
+    try:
+        start = time.perf_counter()
+        results = spider.crawl()
+        elapsed = time.perf_counter() - start
+    finally:
+        spider.close_archive()
+    return len(results), elapsed, spider.stats.get('pages_replayed')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页面存档重放基准')
+    parser.add_argument('-c', '--config', required=True, help='配置文件路径')
+    parser.add_argument('--replay', metavar='DIR', required=True, help='存档目录')
+    parser.add_argument('--rounds', type=int, default=5, help='执行轮数')
+    args = parser.parse_args()
+
+    setup_logger(level=logging.WARNING)
+
+    best = float('inf')
+    for _ in range(args.rounds):
+        count, elapsed, pages = run_once(args.config, args.replay)
+        best = min(best, elapsed)
+    print(f"{pages} pages, {count} items")
+    print(f"replay {pages / best:>10,.1f} pages/s {count / best:>12,.0f} items/s  ({best * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+驱动生命周期压力测试 - 反复运行多线程浏览器爬虫，检查结束后没有残留的浏览器进程
+需要本机安装 Chrome 与 psutil（pip install psutil）。
+使用方法:
+  python benchmarks/stress_drivers.py --runs 20 --concurrent 4 --pages 8
+  python benchmarks/stress_drivers.py --runs 20 --no-pool
+"""
+
+import argparse
+import logging
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import psutil
+except ImportError:
+    raise ImportError("需要安装 psutil: pip install psutil")
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.base_spider import SpiderConfig
+from core.concurrent_spider import ConcurrentBrowserSpider
+from utils.driver_pool import get_driver_pool
+from utils.logger import setup_logger
+
+BROWSER_NAMES = ('chrome', 'chromedriver', 'chromium', 'google-chrome', 'headless_shell')
+
+
+class ListPageHandler(BaseHTTPRequestHandler):
+    """返回固定的商品列表页"""
+
+    def do_GET(self):
+        items = ''.join(
+            f'<li class="gl-item"><a href="/item/{self.path}/{i}">商品 {i}</a></li>' for i in range(20)
+        )
+        body = f'<html><body><ul>{items}</ul></body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def browser_processes() -> set:
+    """当前所有浏览器相关进程的PID"""
+    pids = set()
+    for proc in psutil.process_iter(['pid', 'name']):
+        name = (proc.info['name'] or '').lower()
+        if any(name.startswith(prefix) for prefix in BROWSER_NAMES):
+            pids.add(proc.info['pid'])
+    return pids
+
+
+def main():
+    parser = argparse.ArgumentParser(description='浏览器驱动生命周期压力测试')
+    parser.add_argument('--runs', type=int, default=20, help='运行次数')
+    parser.add_argument('--concurrent', type=int, default=4, help='每次运行的线程数')
+    parser.add_argument('--pages', type=int, default=8, help='每次运行的页数')
+    parser.add_argument('--no-pool', action='store_true', help='不复用驱动（driver_pool.enabled=false）')
+    args = parser.parse_args()
+
+    setup_logger(level=logging.WARNING)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ListPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/search"
+
+    before = browser_processes()
+    totals = {'drivers_spawned': 0, 'drivers_reaped': 0, 'drivers_pooled': 0}
+    try:
+        for run in range(1, args.runs + 1):
+            config = SpiderConfig(
+                name='stress', mode='browser', base_url=base_url, delay=0, max_pages=args.pages,
+                concurrent=args.concurrent, pagination={'param': 'page'},
+                list_page={'item_selector': '.gl-item', 'fields': [
+                    {'name': 'title', 'selector': 'a', 'attribute': 'text'},
+                    {'name': 'url', 'selector': 'a', 'attribute': 'href'},
+                ]},
+                driver_pool={'enabled': not args.no_pool},
+            )
+            spider = ConcurrentBrowserSpider(config)
+            count = len(spider.crawl())
+            stats = spider.stats.as_dict()
+            for key in totals:
+                totals[key] += stats.get(key, 0)
+            live = len(browser_processes() - before)
+            print(f"run {run:>3}: {count} items, spawned {stats.get('drivers_spawned', 0)}, "
+                  f"reaped {stats.get('drivers_reaped', 0)}, pooled {stats.get('drivers_pooled', 0)}, "
+                  f"browser processes alive {live}")
+    finally:
+        get_driver_pool().close()
+        server.shutdown()
+
+    audit = get_driver_pool().audit()
+    orphans = browser_processes() - before
+    print(f"total: spawned {totals['drivers_spawned']}, reaped {totals['drivers_reaped']}, "
+          f"pooled {totals['drivers_pooled']}; pool {audit}")
+    print(f"orphaned browser processes: {len(orphans)}")
+    return 1 if orphans or audit['spawned'] != audit['reaped'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,20 @@
 API爬虫实现
 """
 
-import requests
+import logging
 import time
-from typing import Dict, List, Union
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from typing import Dict, Iterator, List, Optional
 from urllib.parse import urljoin
-import json 
 from .base_spider import BaseSpider, SpiderConfig
+from .extraction import JsonExtractionPlan
+from utils import json_codec
+from utils.autothrottle import is_login_redirect
 from utils.cookie_loader import CookieLoader
+from utils.http_cache import CachedResponse, HttpCache
+from utils.page_archive import PageArchive
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,7 +27,9 @@ class ApiSpider(BaseSpider):
     
     def __init__(self, config: SpiderConfig):
         super().__init__(config)
+        self.plan = JsonExtractionPlan.from_config(config)
         self.session = requests.Session()
+        self._http_cache: Optional[HttpCache] = None
         self._setup_session()
 
 
@@ -61,6 +70,101 @@ class ApiSpider(BaseSpider):
             for cookie in cookies:
                 self.session.cookies.set(cookie['name'], cookie['value'])
     
+    @property
+    def http_cache_enabled(self) -> bool:
+        """是否启用HTTP缓存"""
+        return bool(self.config.http_cache and self.config.http_cache.get('enabled', True))
+
+    def http_cache_path(self) -> str:
+        """HTTP缓存路径，默认位于输出目录下的 .cache 目录"""
+        return self.config.http_cache.get('path') or self._state_path('.cache')
+
+    @property
+    def http_cache(self) -> Optional[HttpCache]:
+        """HTTP缓存，未启用时为None"""
+        if self._http_cache is None and self.http_cache_enabled:
+            options = self.config.http_cache
+            self._http_cache = HttpCache(
+                self.http_cache_path(),
+                ttl=options.get('ttl', 0),
+                max_entries=options.get('max_entries', 10000),
+                max_bytes=options.get('max_bytes', 256 * 1024 * 1024),
+            )
+        return self._http_cache
+
+    def close_http_cache(self):
+        """关闭HTTP缓存"""
+        if self._http_cache is not None:
+            self._http_cache.close()
+            self._http_cache = None
+
+    @staticmethod
+    def _make_response(url: str, status: int, headers: Dict, body: bytes) -> requests.Response:
+        """由缓存或存档构造响应对象"""
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.url = url
+        response.encoding = get_encoding_from_headers(response.headers) or 'utf-8'
+        return response
+
+    def _cached_response(self, entry: CachedResponse) -> requests.Response:
+        """由缓存构造响应对象"""
+        return self._make_response(entry.url, entry.status, entry.headers, entry.body)
+
+    def _request(self, url: str, params: Dict = None, headers: Dict = None) -> requests.Response:
+        """按主机限速后发出GET请求"""
+        self.wait_for_slot(url)
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.config.timeout)
+        except requests.RequestException:
+            self.record_response(url, time.monotonic() - started, error=True)
+            raise
+        self.record_response(url, time.monotonic() - started, response.status_code,
+                             blocked=is_login_redirect(url, response.url))
+        return response
+
+    def _get(self, url: str, params: Dict = None) -> requests.Response:
+        """发出GET请求，启用HTTP缓存时优先使用缓存或条件请求，重放时从存档读取"""
+        if self.replay:
+            body = self.replayed_page(url, params)
+            if body is None:
+                return self._make_response(url, 404, {}, b'')
+            return self._make_response(url, 200, {'content-type': 'application/json'}, body.encode('utf-8'))
+
+        cache = self.http_cache
+        key = entry = None
+        if cache is not None:
+            key = HttpCache.make_key(url, params)
+            entry = cache.get(key)
+            if entry is not None and cache.is_fresh(entry):
+                logger.debug(f"HTTP缓存命中: {url}")
+                self.stats.incr('http_cache_hits')
+                cache.touch(key)
+                return self._cached_response(entry)
+
+        response = self.retry_policy.call(
+            lambda: self._request(url, params, entry.validators() if entry is not None else None),
+            f"请求 {url}",
+            retry_on=(requests.ConnectionError, requests.Timeout)
+        )
+        if cache is None:
+            return response
+
+        if response.status_code == 304 and entry is not None:
+            logger.debug(f"HTTP缓存未修改: {url}")
+            self.stats.incr('http_cache_hits')
+            self.stats.incr('http_cache_not_modified')
+            cache.refresh(key, response.headers)
+            return self._cached_response(entry)
+
+        self.stats.incr('http_cache_misses')
+        if HttpCache.is_cacheable(response.status_code, response.headers):
+            cache.store(key, response.url, response.status_code, dict(response.headers), response.content)
+        return response
+
     def fetch_page(self, url: str, params: Dict = None) -> Dict:
         """获取页面数据 - 增强调试版"""
         try:
@@ -74,12 +178,11 @@ class ApiSpider(BaseSpider):
                 if cookie.name in ['z_c0', '_xsrf']:
                     logger.info(f"请求前cookie: {cookie.name}={cookie.value[:20]}...")
             
-            response = self.session.get(
-                url,
-                params=params or self.config.params,
-                timeout=self.config.timeout
-            )
+            params = params or self.config.params
+            response = self._get(url, params)
             response.raise_for_status()
+            if self.recording:
+                self.record_page(url, response.text, PageArchive.JSON, params)
             
             # 记录响应状态
             logger.info(f"响应状态: {response.status_code}")
@@ -88,21 +191,12 @@ class ApiSpider(BaseSpider):
 
             # 尝试解析JSON
             try:
-                json_data = response.json()
+                json_data = json_codec.response_json(response)
                 logger.info(f"成功解析JSON，数据类型: {type(json_data)}")
                 if isinstance(json_data, dict):
                     logger.info(f"JSON数据keys: {list(json_data.keys())}")
 
-                # 检查知乎特定的错误响应
-                if isinstance(json_data, dict):
-                    if 'error' in json_data:
-                        logger.error(f"API错误: {json_data['error']}")
-                        return {}
-                    if json_data.get('code') != 200 and 'code' in json_data:
-                        logger.error(f"业务错误码: {json_data.get('code')}, 消息: {json_data.get('message', '')}")
-                        return {}
-
-                return json_data
+                return self._check_json(json_data)
 
             except ValueError as e:
                 logger.error(f"响应不是有效的JSON格式: {e}")
@@ -113,27 +207,40 @@ class ApiSpider(BaseSpider):
             logger.error(f"请求失败 {url}: {e}")
             return {}
     
+    def _check_json(self, json_data):
+        """检查业务错误响应，出错时返回空字典"""
+        # 检查知乎特定的错误响应
+        if isinstance(json_data, dict):
+            if 'error' in json_data:
+                logger.error(f"API错误: {json_data['error']}")
+                return {}
+            if json_data.get('code') != 200 and 'code' in json_data:
+                logger.error(f"业务错误码: {json_data.get('code')}, 消息: {json_data.get('message', '')}")
+                return {}
+
+        return json_data
+
+    def _build_params(self, page: int) -> Dict:
+        """构建指定页的请求参数"""
+        params = self.config.params.copy() if self.config.params else {}
+        if self.config.pagination:
+            page_param = self.config.pagination.get('param', 'page')
+            page_size_param = self.config.pagination.get('size_param', 'size')
+            page_size = self.config.pagination.get('size', 20)
+
+            params[page_param] = page
+            if page_size_param:
+                params[page_size_param] = page_size
+        return params
+
     def extract_list_data(self, data: Dict) -> List[Dict]:
         """提取列表页数据 - 适配新结构"""
-        if not self.config.list_page or 'fields' not in self.config.list_page:
+        if not self.plan.has_fields:
             logger.warning("未配置列表页字段")
             return []
 
-        results = []
-        items = data
-
         # 获取数据列表
-        list_selector = self.config.list_page.get('list_selector', '')
-        if list_selector:
-            for path in list_selector.split('.'):
-                if isinstance(items, dict) and path in items:
-                    items = items[path]
-                else:
-                    items = []
-                    break
-
-        if not isinstance(items, list):
-            items = [items] if items else []
+        items = self.plan.select_items(data)
 
         logger.info(f"提取到 {len(items)} 个列表项")
 
@@ -146,139 +253,83 @@ class ApiSpider(BaseSpider):
                     logger.info(f"第一条数据keys: {list(data['data'][0].keys())}")
 
         # 提取字段
-        fields = self.config.list_page.get('fields', [])
-        for i, item in enumerate(items):
-            record = {}
-
-            for field_config in fields:
-                field_name = field_config['name']
-                selector = field_config.get('selector', '')
+        results = [self.plan.extract_record(item) for item in items]
 
-                value = self._extract_value(item, selector)
-                record[field_name] = value
-
-                # 调试：记录提取结果
-                if value:
-                    logger.debug(f"  提取字段 '{field_name}' = '{value[:50]}...'")
-                else:
-                    logger.debug(f"  字段 '{field_name}' 提取为空")
-
-            if record:
-                results.append(record)
+        # 调试：记录提取结果
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, record in enumerate(results):
+                for field_name, value in record.items():
+                    if value:
+                        logger.debug(f"  提取字段 '{field_name}' = '{value[:50]}...'")
+                    else:
+                        logger.debug(f"  字段 '{field_name}' 提取为空")
                 logger.debug(f"记录 {i+1}: {list(record.keys())}")
 
         return results
     
-    def _extract_value(self, data: Union[Dict, str], selector: str) -> str:
-        """从数据中提取值 - 最终修复版"""
-        if not selector:
-            return ''
-        
-        if isinstance(data, dict):
-            # 支持点语法访问嵌套字段
-            keys = selector.split('.')
-            value = data
-            
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
-                else:
-                    return ''
-            
-            # 处理不同类型的值
-            if value is None:
-                return ''
-            elif isinstance(value, (str, int, float)):
-                return str(value)
-            elif isinstance(value, dict):
-                # 如果值是dict，尝试获取text字段（知乎的新格式）
-                if 'text' in value:
-                    return str(value['text'])
-                else:
-                    return json.dumps(value, ensure_ascii=False)[:100]
-            elif isinstance(value, list):
-                return ','.join(map(str, value))
-            else:
-                return str(value)
-        
-        return ''
-    
     def crawl_detail_page(self, url: str) -> Dict:
         """爬取详情页"""
         try:
             data = self.fetch_page(url)
-            detail_data = {}
-            
-            if self.config.detail_page and 'fields' in self.config.detail_page:
-                for field_config in self.config.detail_page['fields']:
-                    field_name = field_config['name']
-                    selector = field_config.get('selector', '')
-                    attribute = field_config.get('attribute', 'text')
-                    
-                    value = self._extract_value(data, selector, attribute)
-                    detail_data[field_name] = value
-            
-            return detail_data
+            return self.plan.extract_detail(data)
         except Exception as e:
             logger.error(f"爬取详情页失败 {url}: {e}")
             return {}
     
-    def crawl(self) -> List[Dict]:
-        """执行爬取"""
+    def iter_crawl(self) -> Iterator[Dict]:
+        """执行爬取，逐页产出记录"""
         logger.info(f"开始API爬虫: {self.config.name}")
         self.validate_config()
-        
-        current_page = 1
-        while current_page <= self.config.max_pages:
-            logger.info(f"爬取第 {current_page} 页")
-            
-            # 构建请求参数
-            params = self.config.params.copy() if self.config.params else {}
-            if self.config.pagination:
-                page_param = self.config.pagination.get('param', 'page')
-                page_size_param = self.config.pagination.get('size_param', 'size')
-                page_size = self.config.pagination.get('size', 20)
-                
-                params[page_param] = current_page
-                if page_size_param:
-                    params[page_size_param] = page_size
-            
-            # 获取数据
-            url = self.config.base_url
-            data = self.fetch_page(url, params)
-            
-            if not data:
-                break
-            
-            # 提取列表数据
-            list_data = self.extract_list_data(data)
-            if not list_data:
-                break
-            
-            # 处理详情页
-            if self.config.detail_page:
-                for item in list_data:
-                    if '_detail_url' in item:
-                        detail_data = self.crawl_detail_page(item['_detail_url'])
-                        item.update(detail_data)
-                        del item['_detail_url']  # 删除临时字段
-            
-            self.results.extend(list_data)
-            
-            # 检查是否还有下一页
-            if not self._has_next_page(data, current_page):
-                break
-            
-            current_page += 1
-            time.sleep(self.config.delay)
-        
-        logger.info(f"爬取完成，共获取 {len(self.results)} 条数据")
-        return self.results
-    
+
+        count = 0
+        try:
+            current_page = 1
+            while current_page <= self.config.max_pages:
+                logger.info(f"爬取第 {current_page} 页")
+
+                # 获取数据
+                url = self.config.base_url
+                data = self.fetch_page(url, self._build_params(current_page))
+
+                if not data:
+                    break
+
+                # 提取列表数据
+                list_data = self.extract_list_data(data)
+                if not list_data:
+                    break
+
+                # 跳过以往运行中已保存的数据
+                fresh_data = self.filter_known(list_data)
+                if self.should_stop_on_known(list_data, fresh_data):
+                    break
+                list_data = fresh_data
+
+                # 处理详情页
+                if self.config.detail_page:
+                    for item in list_data:
+                        if '_detail_url' in item:
+                            detail_data = self.crawl_detail_page(item['_detail_url'])
+                            item.update(detail_data)
+                            del item['_detail_url']  # 删除临时字段
+
+                yield from list_data
+                count += len(list_data)
+
+                # 检查是否还有下一页
+                if not self._has_next_page(data, current_page):
+                    break
+
+                current_page += 1
+        finally:
+            self.close_http_cache()
+
+        logger.info(f"爬取完成，共获取 {count} 条数据")
+
     def _has_next_page(self, data: Dict, current_page: int) -> bool:
         """检查是否还有下一页"""
         if not self.config.pagination:
             return False
         
         # 简单的分页逻辑，可以根据实际情况调整
-        return len(self.extract_list_data(data)) > 0
\ No newline at end of file
+        return len(self.plan.select_items(data)) > 0
\ No newline at end of file
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+异步API爬虫实现 - 并发获取列表页与详情页
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from .api_spider import ApiSpider
+from .base_spider import SpiderConfig
+from utils import json_codec
+from utils.autothrottle import is_login_redirect
+from utils.logger import get_logger
+from utils.page_archive import PageArchive
+
+logger = get_logger(__name__)
+
+
+class AsyncApiSpider(ApiSpider):
+    """异步API爬虫类
+
+    沿用 ApiSpider 的会话配置与 list_selector/fields 提取规则，
+    以 concurrent 作为并发上限，同时请求多个列表页及其详情页。
+    依赖 httpx（pip install httpx）。
+    """
+
+    def __init__(self, config: SpiderConfig):
+        super().__init__(config)
+        self.concurrency = max(1, self.config.concurrent)
+        self._retry_errors = ()
+
+    def _create_client(self):
+        """创建异步HTTP客户端，复用同步会话的请求头、cookies与代理"""
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("api_async 模式需要安装 httpx: pip install httpx")
+
+        self._retry_errors = (httpx.TransportError,)
+
+        return httpx.AsyncClient(
+            headers=dict(self.session.headers),
+            cookies={cookie.name: cookie.value for cookie in self.session.cookies},
+            proxy=self.config.proxy,
+            timeout=self.config.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency),
+            follow_redirects=True,
+        )
+
+    async def _request_async(self, client, url: str, params: Optional[Dict] = None):
+        """按主机限速后发出GET请求"""
+        await self.wait_for_slot_async(url)
+        started = time.monotonic()
+        try:
+            response = await client.get(url, params=params)
+        except self._retry_errors:
+            self.record_response(url, time.monotonic() - started, error=True)
+            raise
+        self.record_response(url, time.monotonic() - started, response.status_code,
+                             blocked=is_login_redirect(url, str(response.url)))
+        return response
+
+    async def _fetch_json(self, client, semaphore: asyncio.Semaphore, url: str,
+                          params: Optional[Dict] = None):
+        """获取并解析JSON数据，失败时返回空字典"""
+        if self.replay:
+            body = self.replayed_page(url, params)
+            try:
+                return self._check_json(json_codec.loads(body)) if body else {}
+            except ValueError as e:
+                logger.error(f"存档内容不是有效的JSON格式: {e}")
+                return {}
+
+        async with semaphore:
+            try:
+                logger.debug(f"请求URL: {url} 参数: {params}")
+                response = await self.retry_policy.call_async(
+                    lambda: self._request_async(client, url, params),
+                    f"请求 {url}",
+                    retry_on=self._retry_errors
+                )
+                response.raise_for_status()
+            except Exception as e:
+                logger.error(f"请求失败 {url}: {e}")
+                return {}
+
+        try:
+            data = json_codec.response_json(response)
+        except ValueError as e:
+            logger.error(f"响应不是有效的JSON格式: {e}")
+            logger.error(f"响应内容预览: {response.text[:500]}...")
+            return {}
+
+        self.record_page(url, response.text, PageArchive.JSON, params)
+        return self._check_json(data)
+
+    async def _crawl_detail(self, client, semaphore: asyncio.Semaphore, item: Dict):
+        """爬取单条记录的详情页并合并到记录中"""
+        # 与 ApiSpider.fetch_page 一致使用配置的请求参数，两种模式录制的存档可以互相重放
+        data = await self._fetch_json(client, semaphore, item.pop('_detail_url'), self.config.params)
+        item.update(self.plan.extract_detail(data))
+
+    async def _crawl_page(self, client, semaphore: asyncio.Semaphore, page: int):
+        """获取一个列表页，并在该页返回后立即并发获取其详情页
+
+        Returns:
+            (原始数据, 列表数据, 过滤已见记录后的数据)
+        """
+        data = await self._fetch_json(client, semaphore, self.config.base_url, self._build_params(page))
+        list_data = self.extract_list_data(data) if data else []
+
+        # 跳过以往运行中已保存的数据
+        fresh_data = self.filter_known(list_data)
+
+        # 处理详情页
+        if self.config.detail_page:
+            await asyncio.gather(*(
+                self._crawl_detail(client, semaphore, item)
+                for item in fresh_data if '_detail_url' in item
+            ))
+        return data, list_data, fresh_data
+
+    async def _iter_pages_async(self) -> AsyncIterator[List[Dict]]:
+        """按窗口并发获取列表页，按页序逐页产出结果，遇到空页即停止"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._create_client() as client:
+            current_page = 1
+            while current_page <= self.config.max_pages:
+                window = range(current_page, min(current_page + self.concurrency, self.config.max_pages + 1))
+                logger.info(f"并发爬取第 {window[0]}-{window[-1]} 页")
+
+                pages = await asyncio.gather(*(
+                    self._crawl_page(client, semaphore, page) for page in window
+                ))
+
+                # 按页序产出，遇到停止条件后丢弃之后的页
+                for page, (data, list_data, fresh_data) in zip(window, pages):
+                    if not list_data or self.should_stop_on_known(list_data, fresh_data):
+                        return
+
+                    yield fresh_data
+
+                    if not self._has_next_page(data, page):
+                        return
+
+                current_page = window[-1] + 1
+
+    def iter_crawl(self) -> Iterator[Dict]:
+        """执行异步爬取，在独立的事件循环中驱动，逐页产出记录"""
+        logger.info(f"开始异步API爬虫: {self.config.name} (并发: {self.concurrency})")
+        self.validate_config()
+
+        count = 0
+        loop = asyncio.new_event_loop()
+        pages = self._iter_pages_async()
+        try:
+            while True:
+                try:
+                    records = loop.run_until_complete(pages.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield from records
+                count += len(records)
+        finally:
+            loop.run_until_complete(pages.aclose())
+            loop.close()
+
+        logger.info(f"爬取完成，共获取 {count} 条数据")
@@ -3,18 +3,34 @@
 基础爬虫类
 """
 
+import asyncio
+import threading
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
+from urllib.parse import urlparse
+
+from utils import json_codec
+from utils.autothrottle import AutoThrottle, is_login_redirect
+from utils.dedup import DedupIndex
+from utils.driver_pool import get_driver_pool
+from utils.logger import get_logger
+from utils.page_archive import PageArchive
+from utils.rate_limiter import RateLimiter, get_rate_limiter
+from utils.retry import RetryPolicy
+from utils.seen_store import SeenStore
+from utils.stats import RunStats
+
+logger = get_logger(__name__)
 
 
 @dataclass
 class SpiderConfig:
     """爬虫配置数据类"""
     name: str
-    mode: str  # 'api' or 'browser'
+    mode: str  # 'api', 'api_async' or 'browser'
     base_url: str
     headers: Optional[Dict] = None
     params: Optional[Dict] = None
@@ -30,16 +46,26 @@ class SpiderConfig:
     user_agent: Optional[str] = None
     concurrent: int = 1  # 并发线程数
     retry_times: int = 3  # 重试次数
+    retry: Optional[Dict] = None  # 重试退避配置
+    rate_limit: Optional[Dict] = None  # 按主机限速配置
+    autothrottle: Optional[Dict] = None  # 自适应请求间隔配置
     custom_pagination: Optional[Dict] = None  # 自定义分页配置
     filters: Optional[Dict] = None  # 数据过滤配置
-    output_format: str = 'json'  # 输出格式：json, csv, xlsx
+    output_format: str = 'json'  # 输出格式：json, jsonl, parquet, sqlite, csv, xlsx
+    output_options: Optional[Dict] = None  # 输出选项（压缩、刷新间隔等）
     output_path: Optional[str] = None  # 输出路径
+    seen_store: Optional[Dict] = None  # 跨运行去重配置
+    http_cache: Optional[Dict] = None  # HTTP条件请求缓存配置（api模式）
+    html_parser: str = 'lxml'  # HTML解析后端：lxml, html.parser
+    driver_pool: Optional[Dict] = None  # 浏览器驱动池配置（browser模式）
+    block_resources: Optional[Dict] = None  # 浏览器资源拦截配置（browser模式）
+    readiness: Optional[Dict] = None  # 页面就绪条件配置（browser模式）
 
     @classmethod
     def from_json(cls, json_path: str) -> 'SpiderConfig':
         """从JSON文件加载配置"""
         with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            data = json_codec.load(f)
         return cls(**data)
 
 
@@ -49,16 +75,304 @@ class BaseSpider(ABC):
     def __init__(self, config: SpiderConfig):
         self.config = config
         self.results: List[Dict] = []
+        self.stats = RunStats()
+        self.retry_policy = RetryPolicy.from_config(config, self.stats)
+        self.rate_limiter = get_rate_limiter()
+        self.driver_pool = get_driver_pool()
+        self._rate_rules: Dict[str, Tuple[str, float, int]] = {}
+        self.autothrottle = AutoThrottle.from_config(config, self.stats)
+        # 自适应限速只作用于本爬虫：限速键 -> 请求间隔(秒) / 下一次可发出请求的时间
+        self._adaptive_delays: Dict[str, float] = {}
+        self._adaptive_next: Dict[str, float] = {}
+        self._adaptive_lock = threading.Lock()
+        self.dedup_index = DedupIndex.from_config(config)
+        self._seen_store: Optional[SeenStore] = None
+        self._seen_store_lock = threading.Lock()  # 并发线程首次访问时只打开一个存储
+        self.archive: Optional[PageArchive] = None
+        self.replay = False  # 是否从存档重放，重放时不访问网络
+        self._login_pending = False  # 注入cookies后尚未确认登录状态
     
     @abstractmethod
-    def crawl(self) -> List[Dict]:
-        """执行爬取"""
+    def iter_crawl(self) -> Iterator[Dict]:
+        """执行爬取，逐条产出记录
+
+        调用方可边爬取边写入，不必在内存中保留全部结果；提前停止迭代时爬虫释放资源。
+        """
         pass
+
+    def crawl(self) -> List[Dict]:
+        """执行爬取，返回全部记录"""
+        self.results = list(self.iter_crawl())
+        return self.results
+
+    @staticmethod
+    def _take(records: Iterable[Dict], limit: int = 0) -> Iterator[Dict]:
+        """产出至多 limit 条记录（0表示不限制），达到上限后关闭数据源"""
+        records = iter(records)
+        count = 0
+        try:
+            for record in records:
+                yield record
+                count += 1
+                if limit > 0 and count >= limit:
+                    logger.info(f"已达到最大数据量 {limit}")
+                    break
+        finally:
+            close = getattr(records, 'close', None)
+            if close is not None:
+                close()
     
+    @property
+    def output_fields(self) -> List[str]:
+        """输出字段名，由提取计划确定，用于表格类输出的列"""
+        plan = getattr(self, 'plan', None)
+        return list(plan.output_fields) if plan is not None else []
+
     def validate_config(self) -> bool:
         """验证配置"""
         required_fields = ['name', 'mode', 'base_url']
         for field in required_fields:
             if not getattr(self.config, field):
                 raise ValueError(f"缺少必需配置项: {field}")
-        return True
\ No newline at end of file
+        return True
+
+    def _rate_rule(self, url: str) -> Tuple[str, float, int]:
+        """URL对应的限速规则，按主机缓存"""
+        host = urlparse(url).hostname or ''
+        rule = self._rate_rules.get(host)
+        if rule is None:
+            rule = self._rate_rules[host] = RateLimiter.resolve(url, self.config)
+        return rule
+
+    def _adaptive_wait(self, key: str, ceiling: float) -> float:
+        """按本爬虫的自适应请求间隔预占下一次请求的时间
+
+        Returns:
+            float: 需要额外等待的秒数
+        """
+        if key not in self._adaptive_delays and self.autothrottle is not None:
+            # 收到第一个响应前按初始请求间隔
+            self._set_adaptive_delay(key, ceiling, self.autothrottle.delay(key))
+        with self._adaptive_lock:
+            delay = self._adaptive_delays.get(key, 0.0)
+            if delay <= 0:
+                return 0.0
+            now = time.monotonic()
+            slot = max(now, self._adaptive_next.get(key, 0.0))
+            self._adaptive_next[key] = slot + delay
+            return slot - now
+
+    def wait_for_slot(self, url: str) -> float:
+        """按主机限速，阻塞直到可以向该主机发出请求
+
+        Returns:
+            float: 等待的秒数
+        """
+        key, rate, burst = self._rate_rule(url)
+        waited = self.rate_limiter.acquire(key, rate, burst)
+        extra = self._adaptive_wait(key, rate)
+        if extra > 0:
+            time.sleep(extra)
+            waited += extra
+        if waited:
+            self.stats.incr('throttle_wait', waited)
+        return waited
+
+    async def wait_for_slot_async(self, url: str) -> float:
+        """wait_for_slot 的异步版本"""
+        key, rate, burst = self._rate_rule(url)
+        waited = await self.rate_limiter.acquire_async(key, rate, burst)
+        extra = self._adaptive_wait(key, rate)
+        if extra > 0:
+            await asyncio.sleep(extra)
+            waited += extra
+        if waited:
+            self.stats.incr('throttle_wait', waited)
+        return waited
+
+    def record_response(self, url: str, latency: float, status: Optional[int] = None,
+                        blocked: bool = False, error: bool = False):
+        """向自适应限速反馈一次响应，并调整本爬虫对该主机的请求间隔
+
+        自适应速率不超过 rate_limit 配置的速率；共享令牌桶保持配置值，不受本爬虫的调整影响。
+        """
+        if self.autothrottle is None:
+            return
+        key, ceiling, _ = self._rate_rule(url)
+        delay = self.autothrottle.observe(key, latency, status, blocked, error)
+        self.stats.set('autothrottle_delay', round(self._set_adaptive_delay(key, ceiling, delay), 3))
+
+    def _set_adaptive_delay(self, key: str, ceiling: float, delay: float) -> float:
+        """设置本爬虫对限速键的请求间隔，速率不超过 rate_limit
+
+        Returns:
+            float: 实际生效的请求间隔(秒)
+        """
+        rate = 1.0 / delay if delay > 0 else 0.0
+        if ceiling > 0:
+            rate = min(ceiling, rate) if rate > 0 else ceiling
+        interval = 1.0 / rate if rate > 0 else 0.0
+        with self._adaptive_lock:
+            # 间隔缩短时，已预占的下一次请求时间按新间隔提前
+            previous = self._adaptive_delays.get(key)
+            if previous and key in self._adaptive_next and interval < previous:
+                self._adaptive_next[key] -= previous - interval
+            self._adaptive_delays[key] = interval
+        return interval
+
+    def check_login(self, url: str, final_url: str) -> bool:
+        """判断访问是否被重定向到登录页
+
+        注入cookies后的第一次访问同时用来确认cookies是否有效，无需额外访问页面或等待。
+
+        Returns:
+            bool: 是否被重定向到登录页
+        """
+        blocked = is_login_redirect(url, final_url)
+        if self._login_pending:
+            self._login_pending = False
+            if blocked:
+                logger.warning(f"检测到重定向到登录页面，cookie可能无效: {final_url}")
+            else:
+                logger.info(f"Cookie验证成功，当前页面: {final_url}")
+        return blocked
+
+    def lease_driver(self, key: Tuple, factory: Callable):
+        """从进程内共享的驱动池借出浏览器驱动，driver_pool.enabled 为 false 时总是新建
+
+        Args:
+            key: 浏览器启动参数标识，参数相同的爬虫共用驱动
+            factory: 创建驱动的函数
+        """
+        def spawn():
+            driver = factory()
+            self.stats.incr('drivers_spawned')
+            return driver
+
+        options = self.config.driver_pool or {}
+        return self.driver_pool.acquire(key, spawn, max_pages=options.get('max_pages'),
+                                        max_rss_mb=options.get('max_rss_mb'),
+                                        reuse=options.get('enabled', True))
+
+    def return_driver(self, driver, discard: bool = False):
+        """归还浏览器驱动，统计放回驱动池（drivers_pooled）与退出（drivers_reaped）的驱动数"""
+        if driver is None:
+            return
+        pooled = self.driver_pool.release(driver, discard)
+        self.stats.incr('drivers_pooled' if pooled else 'drivers_reaped')
+
+    def open_archive(self, directory: str, replay: bool = False):
+        """打开页面存档：录制时保存抓取到的页面，重放时从存档读取页面而不访问网络"""
+        self.close_archive()
+        self.archive = PageArchive.for_spider(directory, self.config.name, readonly=replay)
+        self.replay = replay
+        logger.info(f"{'重放' if replay else '录制'}页面存档: {self.archive.path}")
+
+    def close_archive(self):
+        """关闭页面存档"""
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    @property
+    def recording(self) -> bool:
+        """是否正在录制页面"""
+        return self.archive is not None and not self.replay
+
+    def record_page(self, url: str, body: str, kind: str = PageArchive.LIST, params: Optional[Dict] = None):
+        """录制模式下保存页面"""
+        if self.recording and body:
+            self.archive.put(url, body, kind, params)
+            self.stats.incr('pages_recorded')
+
+    def replayed_page(self, url: str, params: Optional[Dict] = None) -> Optional[str]:
+        """重放模式下读取存档中的页面，不存在时返回None"""
+        body = self.archive.get(url, params)
+        if body is None:
+            logger.warning(f"存档中没有页面: {url}")
+        else:
+            self.stats.incr('pages_replayed')
+        return body
+
+    @property
+    def seen_store_enabled(self) -> bool:
+        """是否启用跨运行去重"""
+        return bool(self.config.seen_store and self.config.seen_store.get('enabled', True))
+
+    def _state_path(self, subdir: str) -> str:
+        """跨运行状态文件的默认路径：输出目录下的 subdir 目录"""
+        output_dir = Path(self.config.output_path).parent if self.config.output_path else Path('output')
+        return str(output_dir / subdir / f"{self.config.name}.sqlite")
+
+    def seen_store_path(self) -> str:
+        """已见记录存储路径，默认位于输出目录下的 .seen 目录"""
+        options = self.config.seen_store or {}
+        return options.get('path') or self._state_path('.seen')
+
+    @property
+    def seen_store(self) -> Optional[SeenStore]:
+        """已见记录存储，未启用时为None"""
+        if self._seen_store is None and self.seen_store_enabled:
+            with self._seen_store_lock:
+                if self._seen_store is None:
+                    self._seen_store = SeenStore(self.seen_store_path(), self.config.seen_store.get('ttl', 0))
+        return self._seen_store
+
+    def reset_seen_store(self):
+        """清空已见记录"""
+        self.close_seen_store()
+        SeenStore.reset(self.seen_store_path())
+
+    def close_seen_store(self):
+        """关闭已见记录存储"""
+        with self._seen_store_lock:
+            if self._seen_store is not None:
+                self._seen_store.close()
+                self._seen_store = None
+
+    def _seen_key(self, item: Dict) -> str:
+        """记录在已见存储中的键
+
+        未配置 dedup_keys 时只取列表页字段计算，使过滤（详情页合并前）与标记（合并后）的键一致。
+        """
+        plan = getattr(self, 'plan', None)
+        if not self.dedup_index.keys and plan is not None and plan.fields:
+            item = {field.name: item.get(field.name) for field in plan.fields}
+        return self.dedup_index.digest(item).hex()
+
+    def filter_known(self, items: List[Dict]) -> List[Dict]:
+        """过滤掉以往运行中已保存过的记录，重放时不过滤（重放的数据也不计入已见记录）"""
+        if self.replay:
+            return items
+        store = self.seen_store
+        if store is None or not items or not self.config.seen_store.get('skip_known', True):
+            return items
+
+        keys = [self._seen_key(item) for item in items]
+        known = store.known(keys)
+        if not known:
+            return items
+
+        fresh = [item for item, key in zip(items, keys) if key not in known]
+        logger.info(f"跳过 {len(items) - len(fresh)} 条已爬取过的数据")
+        return fresh
+
+    def should_stop_on_known(self, items: List[Dict], fresh: List[Dict]) -> bool:
+        """整页数据均已见过时是否提前停止，重放时不停止"""
+        if self.replay or not items or fresh or not self.seen_store_enabled:
+            return False
+        if self.config.seen_store.get('stop_when_all_known', False):
+            logger.info("当前页数据均已爬取过，提前停止")
+            return True
+        return False
+
+    def mark_seen(self, records: List[Dict]) -> int:
+        """将已保存的记录写入已见存储
+
+        Returns:
+            int: 写入的记录数
+        """
+        store = self.seen_store
+        if store is None or not records:
+            return 0
+        return store.add_many(self._seen_key(record) for record in records)
@@ -3,8 +3,9 @@
 浏览器爬虫实现
 """
 
+import shutil
 import time
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Union
 from urllib.parse import urljoin
 
 import logging
@@ -13,14 +14,39 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from bs4.element import Tag
 
 from .base_spider import BaseSpider, SpiderConfig
+from .extraction import ExtractionPlan, JsEngineError, extract_in_browser
+from .http_detail import HttpDetailFetcher
+from .readiness import PageReadiness
 from utils.cookie_loader import CookieLoader
+from utils.driver_pool import make_profile_dir
+from utils.html_parser import HtmlParser
 from utils.logger import get_logger
+from utils.page_archive import PageArchive
+from utils.resource_blocker import ResourceBlocker
 
 logger = get_logger(__name__)
 
+# 返回第 N 个之后新追加的列表项 outerHTML；节点数少于 N 时从头返回
+NEW_ITEMS_SCRIPT = """
+var nodes = document.querySelectorAll(arguments[0]);
+var start = arguments[1] <= nodes.length ? arguments[1] : 0;
+var fragments = [];
+for (var i = start; i < nodes.length; i++) {
+    fragments.push(nodes[i].outerHTML);
+}
+return [nodes.length, start, fragments];
+"""
+
+# 返回下一页按钮是否存在及其 disabled 属性
+NEXT_BUTTON_SCRIPT = """
+var button = document.querySelector(arguments[0]);
+return button ? [true, button.getAttribute('disabled')] : [false, null];
+"""
+
 
 class BrowserSpider(BaseSpider):
     """浏览器爬虫类"""
@@ -28,9 +54,39 @@ class BrowserSpider(BaseSpider):
     def __init__(self, config: SpiderConfig):
         super().__init__(config)
         self.driver = None
+        self.html_parser = HtmlParser.from_config(config)
+        self.plan = ExtractionPlan.from_config(config)
+        self.incremental = bool(self.config.list_page and self.config.list_page.get('incremental', False))
+        if self.incremental and not self.plan.item_selector:
+            logger.warning("增量提取需要配置 item_selector，已关闭增量提取")
+            self.incremental = False
+        self._consumed_items = 0  # 增量模式下已提取的列表项数量
+        self.js_engine = self.plan.engine == 'js'
+        self.resource_blocker = ResourceBlocker.from_config(config)
+        self.readiness = PageReadiness.from_config(config, 'list')
+        self.detail_readiness = PageReadiness.from_config(config, 'detail')
+        self.http_detail = HttpDetailFetcher.from_spider(self)
     
     def _setup_driver(self):
-        """设置浏览器驱动"""
+        """从驱动池借出浏览器驱动"""
+        self.driver = self.lease_driver(
+            ('browser', self.config.user_agent, self.config.proxy, self.resource_blocker is not None,
+             self.readiness.page_load_strategy),
+            self._create_driver
+        )
+        self.driver.set_page_load_timeout(self.config.timeout)
+        if self.resource_blocker:
+            self.resource_blocker.apply(self.driver)
+
+    def _release_driver(self):
+        """将浏览器驱动归还驱动池"""
+        if self.driver:
+            self.return_driver(self.driver)
+            self.driver = None
+            logger.info("浏览器驱动已归还")
+
+    def _create_driver(self) -> webdriver.Chrome:
+        """创建浏览器驱动"""
         try:
             chrome_options = Options()
 
@@ -92,8 +148,9 @@ class BrowserSpider(BaseSpider):
             chrome_options.add_argument('--test-type=webdriver')
             chrome_options.add_argument('--window-size=1920,1080')
 
-            # 用户数据目录 - 保持会话 (使用临时目录)
-            chrome_options.add_argument('--user-data-dir=C:/temp/chrome-user-data')
+            # 用户数据目录 - 每个浏览器独立的临时目录，驱动退出时由驱动池删除
+            profile_dir = make_profile_dir()
+            chrome_options.add_argument(f'--user-data-dir={profile_dir}')
             chrome_options.add_argument('--profile-directory=Default')
             chrome_options.add_argument('--remote-debugging-port=0')
 
@@ -108,201 +165,180 @@ class BrowserSpider(BaseSpider):
             if self.config.proxy:
                 chrome_options.add_argument(f'--proxy-server={self.config.proxy}')
 
+            # 资源拦截需要性能日志统计传输量
+            if self.resource_blocker:
+                ResourceBlocker.enable_logging(chrome_options)
+
+            # eager：DOMContentLoaded 后即返回，其余由就绪条件判断
+            chrome_options.page_load_strategy = self.readiness.page_load_strategy
+
             # 创建驱动
-            self.driver = webdriver.Chrome(options=chrome_options)
+            try:
+                driver = webdriver.Chrome(options=chrome_options)
+            except Exception:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+                raise
+            driver.profile_dir = profile_dir
 
             # 执行反检测脚本
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en-US', 'en']})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'mimeTypes', {get: () => [1,2,3,4,5]})")
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]})")
+            driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en-US', 'en']})")
+            driver.execute_script("Object.defineProperty(navigator, 'mimeTypes', {get: () => [1,2,3,4,5]})")
 
             # 设置窗口大小和位置
-            self.driver.set_window_size(1920, 1080)
-            self.driver.set_window_position(0, 0)
-
-            # 设置页面加载超时
-            self.driver.set_page_load_timeout(self.config.timeout)
+            driver.set_window_size(1920, 1080)
+            driver.set_window_position(0, 0)
 
             logger.info("浏览器驱动初始化成功")
+            return driver
 
         except Exception as e:
             logger.error(f"初始化浏览器驱动失败: {e}")
             raise
     
     def load_cookies(self):
-        """加载cookies"""
+        """在访问第一个页面前注入cookies，登录状态由第一次访问确认"""
         if self.config.cookies_file and self.driver:
-            cookie_loader = CookieLoader(self.config.cookies_file)
-            cookies = cookie_loader.load()
-
-            if cookies:
-                # 先访问基础域名以设置cookie
-                domain = ".jd.com"
-                if "jd.com" in self.config.base_url:
-                    self.driver.get("https://www.jd.com")
-                else:
-                    self.driver.get(self.config.base_url)
-
-                time.sleep(3)
-
-                # 添加cookies前先清空现有cookies
-                self.driver.delete_all_cookies()
-
-                # 添加cookies
-                jd_cookies_added = 0
-                for cookie in cookies:
-                    try:
-                        # 过滤掉不安全的cookie字段并转换格式
-                        safe_cookie = {}
-                        for k, v in cookie.items():
-                            if k in ['name', 'value', 'domain', 'path', 'secure']:
-                                safe_cookie[k] = v
-                            elif k == 'expirationDate':
-                                safe_cookie['expiry'] = int(v)
-
-                        # 确保domain格式正确
-                        if 'domain' not in safe_cookie:
-                            safe_cookie['domain'] = domain
-
-                        # 确保path存在
-                        if 'path' not in safe_cookie:
-                            safe_cookie['path'] = '/'
-
-                        self.driver.add_cookie(safe_cookie)
-                        jd_cookies_added += 1
-
-                    except Exception as e:
-                        logger.warning(f"添加cookie失败: {e}")
-
-                logger.info(f"成功添加 {jd_cookies_added} 个cookies")
-
-                # 等待一下让cookies生效
-                time.sleep(2)
-
-                # 重新访问目标页面
-                self.driver.get(self.config.base_url)
-                time.sleep(3)
-
-                # 验证登录状态
-                current_url = self.driver.current_url
-                if "login" in current_url.lower() or "passport" in current_url.lower():
-                    logger.warning("检测到重定向到登录页面，cookie可能无效")
-                else:
-                    logger.info("Cookie验证成功，当前页面: {}".format(current_url))
-
+            if CookieLoader(self.config.cookies_file).apply_to_driver(self.driver, self.config.base_url):
+                self._login_pending = True
                 logger.info("Cookies加载完成")
-    
-    def fetch_page(self, url: str) -> str:
-        """获取页面HTML"""
+
+    def _get(self, url: str):
+        """按主机限速后访问页面，并将加载耗时与登录重定向反馈给自适应限速"""
+        self.wait_for_slot(url)
+        started = time.monotonic()
+        self.driver_pool.count_page(self.driver)
         try:
-            logger.debug(f"访问页面: {url}")
             self.driver.get(url)
-            time.sleep(self.config.delay)
-            
-            # 等待特定元素加载
-            if self.config.list_page and 'wait_selector' in self.config.list_page:
-                WebDriverWait(self.driver, self.config.timeout).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, self.config.list_page['wait_selector'])
-                    )
-                )
-            
-            return self.driver.page_source
+        except WebDriverException:
+            self.record_response(url, time.monotonic() - started, error=True)
+            raise
+        self.record_response(url, time.monotonic() - started,
+                             blocked=self.check_login(url, self.driver.current_url))
+        if self.resource_blocker:
+            self.resource_blocker.report(self.driver, url, self.stats)
+
+    def _load(self, url: str, readiness: Optional[PageReadiness] = None):
+        """访问页面并等待就绪，未就绪时抛出异常"""
+        logger.debug(f"访问页面: {url}")
+        self._get(url)
+        if not (readiness or self.readiness).wait(self.driver):
+            raise TimeoutException(f"页面未就绪: {url}")
+
+    def _navigate(self, url: str, readiness: Optional[PageReadiness] = None) -> bool:
+        """访问页面并等待就绪，超时等错误按重试策略重试
+
+        Args:
+            url: 页面URL
+            readiness: 就绪条件，默认为列表页的就绪条件
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            self.retry_policy.call(lambda: self._load(url, readiness), f"访问页面 {url}",
+                                   retry_on=(WebDriverException,))
+            return True
             
         except Exception as e:
             logger.error(f"获取页面失败 {url}: {e}")
+            return False
+
+    def fetch_page(self, url: str, readiness: Optional[PageReadiness] = None) -> str:
+        """获取页面HTML，重放时从存档读取"""
+        if self.replay:
+            return self.replayed_page(url) or ""
+        if not self._navigate(url, readiness):
             return ""
+        return self.driver.page_source
     
-    def extract_list_data(self, html: str) -> List[Dict]:
-        """提取列表页数据"""
-        if not self.config.list_page or 'fields' not in self.config.list_page:
+    def extract_list_data(self, page: Union[str, Tag]) -> List[Dict]:
+        """提取列表页数据
+
+        Args:
+            page: 页面HTML或已解析的文档树
+        """
+        if not self.plan.has_fields:
             logger.warning("未配置列表页字段")
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
-        results = []
-        
-        # 提取列表项
-        item_selector = self.config.list_page.get('item_selector', '')
-        if item_selector:
-            items = soup.select(item_selector)
-        else:
-            items = [soup]
-        
+        soup = self.html_parser.parse(page)
+        items = self.plan.select_items(soup)
         logger.debug(f"找到 {len(items)} 个列表项")
-        
-        for item in items:
-            record = {}
-            for field_config in self.config.list_page['fields']:
-                field_name = field_config['name']
-                selector = field_config.get('selector', '')
-                attribute = field_config.get('attribute', 'text')
-                
-                value = self._extract_value_from_element(item, selector, attribute)
-                record[field_name] = value
-            
-            # 提取详情页URL
-            if self.config.detail_page and 'url_selector' in self.config.list_page:
-                detail_url_elem = item.select_one(self.config.list_page['url_selector'])
-                if detail_url_elem and detail_url_elem.get('href'):
-                    detail_url = urljoin(self.config.base_url, detail_url_elem['href'])
-                    record['_detail_url'] = detail_url
-            
-            if record:
-                results.append(record)
-        
-        return results
+
+        return [self.plan.extract_record(item) for item in items]
     
-    def _extract_value_from_element(self, element, selector: str, attribute: str = 'text') -> str:
-        """从HTML元素中提取值"""
+    def _extract_in_browser(self, start: int = 0):
+        """使用浏览器内提取引擎提取列表数据
+
+        Returns:
+            (列表项总数, 实际起始序号, 记录列表)，引擎不可用时返回None并改用页面解析
+        """
         try:
-            if selector:
-                elem = element.select_one(selector)
-                if not elem:
-                    return ''
-            else:
-                elem = element
-            
-            if attribute == 'text':
-                return elem.get_text(strip=True)
-            elif attribute == 'html':
-                return str(elem)
-            else:
-                return elem.get(attribute, '')
-        except Exception as e:
-            logger.error(f"提取元素值失败: {e}")
-            return ''
-    
+            return extract_in_browser(self.driver, self.plan, start)
+        except JsEngineError as e:
+            logger.warning(f"浏览器内提取失败，改用页面解析: {e}")
+            self.js_engine = False
+            return None
+
+    def _snapshot_list_data(self) -> List[Dict]:
+        """提取当前页面的列表数据，增量模式下只提取新追加的列表项"""
+        html = None
+        if self.recording:
+            # 录制完整页面快照，重放时逐个快照提取并由去重索引过滤
+            html = self.driver.page_source
+            self.record_page(self.driver.current_url, html)
+
+        if self.js_engine:
+            result = self._extract_in_browser(self._consumed_items if self.incremental else 0)
+            if result is not None:
+                total, _, records = result
+                self._consumed_items = total
+                return records
+
+        if not self.incremental:
+            return self.extract_list_data(html if html is not None else self.driver.page_source)
+
+        total, start, fragments = self.driver.execute_script(
+            NEW_ITEMS_SCRIPT, self.plan.item_selector, self._consumed_items
+        )
+        if start < self._consumed_items:
+            # 列表节点被回收（虚拟列表），从头重新提取，由去重索引过滤
+            logger.debug(f"列表项数量减少为 {total}，重新提取全部列表项")
+        self._consumed_items = total
+
+        items = self.html_parser.parse_fragments(fragments)
+        logger.debug(f"新增 {len(items)} 个列表项，累计 {total} 个")
+        return [self.plan.extract_record(item) for item in items]
+
     def crawl_detail_page(self, url: str) -> Dict:
         """爬取详情页"""
         try:
-            html = self.fetch_page(url)
-            detail_data = {}
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            if self.config.detail_page and 'fields' in self.config.detail_page:
-                for field_config in self.config.detail_page['fields']:
-                    field_name = field_config['name']
-                    selector = field_config.get('selector', '')
-                    attribute = field_config.get('attribute', 'text')
-                    
-                    value = self._extract_value_from_element(soup, selector, attribute)
-                    detail_data[field_name] = value
-            
-            return detail_data
+            html = self.fetch_page(url, self.detail_readiness)
+            self.record_page(url, html, PageArchive.DETAIL)
+            soup = self.html_parser.parse(html)
+            return self.plan.extract_detail(soup)
         except Exception as e:
             logger.error(f"爬取详情页失败 {url}: {e}")
             return {}
     
-    def crawl(self) -> List[Dict]:
-        """执行爬取"""
+    def iter_crawl(self) -> Iterator[Dict]:
+        """执行爬取，逐批产出记录"""
         logger.info(f"开始浏览器爬虫: {self.config.name}")
         self.validate_config()
 
         # 获取总量控制
         max_total_items = self.config.max_total_items or 0
+        self.dedup_index.clear()
+
+        count = 0
+        if self.replay:
+            for record in self._take(self._crawl_replay(), max_total_items):
+                count += 1
+                yield record
+            logger.info(f"重放完成，共获取 {count} 条数据")
+            return
 
         try:
             self._setup_driver()
@@ -314,116 +350,115 @@ class BrowserSpider(BaseSpider):
 
             if custom_type == 'xiaohongshu':
                 # 小红书特殊分页
-                self.results = self._crawl_xiaohongshu(max_total_items)
+                records = self._crawl_xiaohongshu()
             elif custom_type == 'dynamic_scroll':
                 # 动态滚动分页
-                self.results = self._crawl_dynamic_scroll(max_total_items)
+                records = self._crawl_dynamic_scroll()
             elif pagination_type == 'scroll':
                 # 滚动分页模式
-                self.results = self._crawl_with_scroll(max_total_items)
+                records = self._crawl_with_scroll()
             elif pagination_type == 'click':
                 # 点击加载更多模式
-                self.results = self._crawl_with_click_more(max_total_items)
+                records = self._crawl_with_click_more()
             else:
                 # 传统URL分页模式
-                self.results = self._crawl_with_url_pagination(max_total_items)
+                records = self._crawl_with_url_pagination()
+
+            for record in self._take(records, max_total_items):
+                count += 1
+                yield record
 
         finally:
-            if self.driver:
-                self.driver.quit()
-                logger.info("浏览器驱动已关闭")
+            self._release_driver()
+            if self.http_detail:
+                self.http_detail.close()
 
-        logger.info(f"爬取完成，共获取 {len(self.results)} 条数据")
-        return self.results
+        logger.info(f"爬取完成，共获取 {count} 条数据")
 
-    def _crawl_with_scroll(self, max_total_items: int = 0) -> List[Dict]:
+    def _crawl_with_scroll(self) -> Iterator[Dict]:
         """滚动分页爬取"""
         url = self.config.base_url
         logger.info(f"开始滚动分页爬取: {url}")
 
-        self.driver.get(url)
-        time.sleep(3)
+        self._get(url)
+        self.readiness.wait(self.driver)
+        self._consumed_items = 0
 
-        all_results = []
+        total = 0
         scroll_attempts = 0
         max_scroll_attempts = self.config.pagination.get('max_scroll_attempts', 50) if self.config.pagination else 50
 
         while scroll_attempts < max_scroll_attempts:
             # 获取当前页面内容
-            html = self.driver.page_source
-            current_data = self.extract_list_data(html)
+            current_data = self._snapshot_list_data()
 
             # 过滤已爬取的数据
-            new_data = []
-            for item in current_data:
-                if not self._is_duplicate(item, all_results):
-                    new_data.append(item)
+            new_data = self.dedup_index.filter_new(current_data)
+
+            # 跳过以往运行中已保存的数据
+            fresh_data = self.filter_known(new_data)
+            if self.should_stop_on_known(new_data, fresh_data):
+                break
 
             # 处理详情页
             if self.config.detail_page:
-                new_data = self._process_detail_pages(new_data)
+                fresh_data = self._process_detail_pages(fresh_data)
 
-            all_results.extend(new_data)
-
-            # 检查是否达到总量
-            if max_total_items > 0 and len(all_results) >= max_total_items:
-                logger.info(f"已达到最大数据量 {max_total_items}")
-                return all_results[:max_total_items]
+            yield from fresh_data
+            total += len(fresh_data)
 
             # 检查是否还有新数据
             if len(new_data) == 0:
                 logger.info("没有新数据了，停止爬取")
                 break
 
-            # 滚动到页面底部
+            # 滚动到页面底部，滚动会触发新的请求，先按主机限速
+            self.wait_for_slot(url)
             last_height = self.driver.execute_script("return document.body.scrollHeight")
+            item_count = self.readiness.item_count(self.driver)
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(self.config.delay)
 
-            # 等待新内容加载
+            # 等待新内容加载并稳定
             WebDriverWait(self.driver, 10).until(
                 lambda driver: driver.execute_script("return document.body.scrollHeight") > last_height
             )
+            self.readiness.settle(self.driver, more_than=item_count)
 
             scroll_attempts += 1
-            logger.info(f"已滚动 {scroll_attempts} 次，当前数据量: {len(all_results)}")
-
-        return all_results
+            logger.info(f"已滚动 {scroll_attempts} 次，当前数据量: {total}")
 
-    def _crawl_xiaohongshu(self, max_total_items: int = 0) -> List[Dict]:
+    def _crawl_xiaohongshu(self) -> Iterator[Dict]:
         """小红书特殊分页爬取"""
         url = self.config.base_url
         logger.info(f"开始小红书分页爬取: {url}")
 
-        self.driver.get(url)
-        time.sleep(5)  # 小红书加载较慢
+        self._get(url)
+        self.readiness.wait(self.driver)
+        self._consumed_items = 0
 
-        all_results = []
+        total = 0
         last_item_count = 0
         no_new_count = 0
         max_no_new_attempts = 5
 
         while no_new_count < max_no_new_attempts:
             # 获取当前页面内容
-            html = self.driver.page_source
-            current_data = self.extract_list_data(html)
+            current_data = self._snapshot_list_data()
 
             # 过滤已爬取的数据
-            new_data = []
-            for item in current_data:
-                if not self._is_duplicate(item, all_results):
-                    new_data.append(item)
+            new_data = self.dedup_index.filter_new(current_data)
+
+            # 跳过以往运行中已保存的数据
+            fresh_data = self.filter_known(new_data)
+            if self.should_stop_on_known(new_data, fresh_data):
+                break
 
             # 处理详情页
             if self.config.detail_page:
-                new_data = self._process_detail_pages(new_data)
-
-            all_results.extend(new_data)
+                fresh_data = self._process_detail_pages(fresh_data)
 
-            # 检查是否达到总量
-            if max_total_items > 0 and len(all_results) >= max_total_items:
-                logger.info(f"已达到最大数据量 {max_total_items}")
-                return all_results[:max_total_items]
+            yield from fresh_data
+            total += len(fresh_data)
 
             # 检查是否还有新数据
             if len(new_data) == 0:
@@ -431,17 +466,18 @@ class BrowserSpider(BaseSpider):
                 logger.info(f"第 {no_new_count} 次未获取到新数据")
             else:
                 no_new_count = 0  # 重置计数器
-                logger.info(f"获取到 {len(new_data)} 条新数据，总量: {len(all_results)}")
+                logger.info(f"获取到 {len(new_data)} 条新数据，总量: {total}")
 
             # 小红书特殊滚动逻辑
             if no_new_count < max_no_new_attempts:
-                # 模拟用户行为，先向上滚动一点，再向下滚动
+                # 模拟用户行为，先向上滚动一点，再向下滚动；滚动会触发新的请求，先按主机限速
+                self.wait_for_slot(url)
+                item_count = self.readiness.item_count(self.driver)
                 self.driver.execute_script("window.scrollBy(0, -300);")
-                time.sleep(1)
 
-                # 滚动到页面底部
+                # 滚动到页面底部，等待新内容加载并稳定
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(self.config.delay * 2)  # 小红书需要更长的等待时间
+                self.readiness.settle(self.driver, more_than=item_count)
 
                 # 检查是否有加载提示
                 try:
@@ -453,18 +489,18 @@ class BrowserSpider(BaseSpider):
                 except:
                     pass
 
-        logger.info(f"小红书爬取完成，共获取 {len(all_results)} 条数据")
-        return all_results
+        logger.info(f"小红书爬取完成，共获取 {total} 条数据")
 
-    def _crawl_dynamic_scroll(self, max_total_items: int = 0) -> List[Dict]:
+    def _crawl_dynamic_scroll(self) -> Iterator[Dict]:
         """动态滚动分页爬取"""
         url = self.config.base_url
         logger.info(f"开始动态滚动分页爬取: {url}")
 
-        self.driver.get(url)
-        time.sleep(3)
+        self._get(url)
+        self.readiness.wait(self.driver)
+        self._consumed_items = 0
 
-        all_results = []
+        total = 0
         scroll_pause_time = self.config.custom_pagination.get('scroll_pause_time', 2) if self.config.custom_pagination else 2
         max_scroll_attempts = self.config.custom_pagination.get('max_scroll_attempts', 100) if self.config.custom_pagination else 100
 
@@ -472,29 +508,36 @@ class BrowserSpider(BaseSpider):
 
         for attempt in range(max_scroll_attempts):
             # 获取当前页面内容
-            html = self.driver.page_source
-            current_data = self.extract_list_data(html)
+            current_data = self._snapshot_list_data()
 
             # 过滤已爬取的数据
-            new_data = []
-            for item in current_data:
-                if not self._is_duplicate(item, all_results):
-                    new_data.append(item)
+            new_data = self.dedup_index.filter_new(current_data)
+
+            # 跳过以往运行中已保存的数据
+            fresh_data = self.filter_known(new_data)
+            if self.should_stop_on_known(new_data, fresh_data):
+                break
 
             # 处理详情页
             if self.config.detail_page:
-                new_data = self._process_detail_pages(new_data)
+                fresh_data = self._process_detail_pages(fresh_data)
 
-            all_results.extend(new_data)
+            yield from fresh_data
+            total += len(fresh_data)
 
-            # 检查是否达到总量
-            if max_total_items > 0 and len(all_results) >= max_total_items:
-                logger.info(f"已达到最大数据量 {max_total_items}")
-                return all_results[:max_total_items]
-
-            # 滚动到页面底部
+            # 滚动到页面底部，滚动会触发新的请求，先按主机限速
+            self.wait_for_slot(url)
+            item_count = self.readiness.item_count(self.driver)
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(scroll_pause_time)
+
+            # 等待页面变高（最多 scroll_pause_time 秒），再等待新内容稳定
+            try:
+                WebDriverWait(self.driver, scroll_pause_time, poll_frequency=0.1).until(
+                    lambda driver: driver.execute_script("return document.body.scrollHeight") > last_height
+                )
+                self.readiness.settle(self.driver, more_than=item_count)
+            except TimeoutException:
+                pass
 
             # 检查页面高度是否变化
             new_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -503,42 +546,38 @@ class BrowserSpider(BaseSpider):
                 break
 
             last_height = new_height
-            logger.info(f"已滚动 {attempt + 1} 次，当前数据量: {len(all_results)}")
-
-        return all_results
+            logger.info(f"已滚动 {attempt + 1} 次，当前数据量: {total}")
 
-    def _crawl_with_click_more(self, max_total_items: int = 0) -> List[Dict]:
+    def _crawl_with_click_more(self) -> Iterator[Dict]:
         """点击加载更多模式"""
         url = self.config.base_url
         logger.info(f"开始点击加载更多爬取: {url}")
 
-        self.driver.get(url)
-        time.sleep(3)
+        self._get(url)
+        self.readiness.wait(self.driver)
+        self._consumed_items = 0
 
-        all_results = []
+        total = 0
         max_clicks = self.config.pagination.get('max_clicks', 100) if self.config.pagination else 100
 
         for click_attempt in range(max_clicks):
             # 获取当前页面内容
-            html = self.driver.page_source
-            current_data = self.extract_list_data(html)
+            current_data = self._snapshot_list_data()
 
             # 过滤已爬取的数据
-            new_data = []
-            for item in current_data:
-                if not self._is_duplicate(item, all_results):
-                    new_data.append(item)
+            new_data = self.dedup_index.filter_new(current_data)
+
+            # 跳过以往运行中已保存的数据
+            fresh_data = self.filter_known(new_data)
+            if self.should_stop_on_known(new_data, fresh_data):
+                break
 
             # 处理详情页
             if self.config.detail_page:
-                new_data = self._process_detail_pages(new_data)
-
-            all_results.extend(new_data)
+                fresh_data = self._process_detail_pages(fresh_data)
 
-            # 检查是否达到总量
-            if max_total_items > 0 and len(all_results) >= max_total_items:
-                logger.info(f"已达到最大数据量 {max_total_items}")
-                return all_results[:max_total_items]
+            yield from fresh_data
+            total += len(fresh_data)
 
             # 查找加载更多按钮
             load_more_selector = self.config.pagination.get('load_more_selector', '')
@@ -550,25 +589,21 @@ class BrowserSpider(BaseSpider):
                 load_more_btn = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, load_more_selector))
                 )
+                # 点击会触发新的请求，先按主机限速，再等待新内容加载并稳定
+                self.wait_for_slot(url)
+                item_count = self.readiness.item_count(self.driver)
                 self.driver.execute_script("arguments[0].click();", load_more_btn)
-                time.sleep(self.config.delay)
-                logger.info(f"已点击加载更多 {click_attempt + 1} 次，当前数据量: {len(all_results)}")
+                self.readiness.settle(self.driver, more_than=item_count)
+                logger.info(f"已点击加载更多 {click_attempt + 1} 次，当前数据量: {total}")
             except Exception as e:
                 logger.info("没有更多数据或按钮不可点击，停止爬取")
                 break
 
-        return all_results
-
-    def _crawl_with_url_pagination(self, max_total_items: int = 0) -> List[Dict]:
+    def _crawl_with_url_pagination(self) -> Iterator[Dict]:
         """URL分页模式"""
         current_page = 1
-        all_results = []
 
         while True:
-            if max_total_items > 0 and len(all_results) >= max_total_items:
-                logger.info(f"已达到最大数据量 {max_total_items}")
-                return all_results[:max_total_items]
-
             logger.info(f"爬取第 {current_page} 页")
 
             # 构建URL
@@ -579,83 +614,120 @@ class BrowserSpider(BaseSpider):
                 url = f"{url}{separator}{page_param}={current_page}"
 
             # 获取页面
-            html = self.fetch_page(url)
-            if not html:
+            if not self._navigate(url):
                 break
-
-            # 提取列表数据
-            list_data = self.extract_list_data(html)
+            html = self.driver.page_source if self.recording else None
+            self.record_page(url, html)
+
+            # 提取列表数据：浏览器内提取，或解析一次页面供列表提取与下一页判断共用
+            soup = None
+            result = self._extract_in_browser() if self.js_engine else None
+            if result is not None:
+                list_data = result[2]
+            else:
+                soup = self.html_parser.parse(html if html is not None else self.driver.page_source)
+                list_data = self.extract_list_data(soup)
             if not list_data:
                 break
 
-            # 处理详情页
-            list_data = self._process_detail_pages(list_data)
-
             # 过滤重复数据
-            new_data = []
-            for item in list_data:
-                if not self._is_duplicate(item, all_results):
-                    new_data.append(item)
+            new_data = self.dedup_index.filter_new(list_data)
+
+            # 跳过以往运行中已保存的数据
+            fresh_data = self.filter_known(new_data)
+            if self.should_stop_on_known(new_data, fresh_data):
+                break
 
-            all_results.extend(new_data)
+            # 处理详情页
+            fresh_data = self._process_detail_pages(fresh_data)
+
+            yield from fresh_data
 
             # 检查是否还有下一页
-            if not self._has_next_page(html, current_page) or current_page >= self.config.max_pages:
+            if not self._has_next_page(soup, current_page) or current_page >= self.config.max_pages:
                 break
 
             current_page += 1
 
-        return all_results
+    def _crawl_replay(self) -> Iterator[Dict]:
+        """按录制顺序重放列表页快照，不启动浏览器"""
+
+        for url, html in self.archive.pages(PageArchive.LIST):
+            logger.info(f"重放页面: {url}")
+            self.stats.incr('pages_replayed')
+
+            # 过滤重复数据，滚动加载录制的快照之间大部分列表项相同
+            new_data = self.dedup_index.filter_new(self.extract_list_data(html))
+
+            # 跳过以往运行中已保存的数据
+            fresh_data = self.filter_known(new_data)
+            if self.should_stop_on_known(new_data, fresh_data):
+                break
+
+            # 处理详情页
+            fresh_data = self._process_detail_pages(fresh_data)
+
+            yield from fresh_data
+
+    def _detail_url(self, item: Dict) -> Optional[str]:
+        """取出记录的详情页URL：提取时附带的链接，或 detail_page.url_field 字段"""
+        if '_detail_url' in item:
+            return item.pop('_detail_url')
+        url_field = self.config.detail_page.get('url_field')
+        if url_field and item.get(url_field):
+            return urljoin(self.config.base_url, item[url_field])
+        return None
+
+    def _fetch_details_http(self, urls: List[str]) -> Dict[str, Optional[Dict]]:
+        """使用浏览器当前的cookies并发请求详情页，需要改用浏览器获取的URL对应None"""
+        if not self.http_detail or self.replay or not urls:
+            return {}
+        self.http_detail.sync_from_driver(self.driver)
+        details = self.http_detail.fetch_many(urls)
+        fetched = sum(detail is not None for detail in details.values())
+        self.stats.incr('detail_pages_http', fetched)
+        logger.debug(f"HTTP获取详情页 {fetched}/{len(details)} 个")
+        return details
 
     def _process_detail_pages(self, items: List[Dict]) -> List[Dict]:
-        """处理详情页"""
+        """处理详情页，启用 detail_page.fetcher = "http" 时先并发HTTP请求，失败的逐个改用浏览器"""
         if not self.config.detail_page or not self.config.detail_page.get('enabled', False):
             return items
 
-        processed_items = []
+        detail_urls = [self._detail_url(item) for item in items]
+        details = self._fetch_details_http([url for url in detail_urls if url])
 
-        for item in items:
-            if '_detail_url' in item:
-                detail_url = item['_detail_url']
+        for item, detail_url in zip(items, detail_urls):
+            if not detail_url:
+                continue
+            detail_data = details.get(detail_url)
+            if detail_data is None:
+                if self.http_detail and not self.replay:
+                    self.stats.incr('detail_pages_fallback')
                 detail_data = self.crawl_detail_page(detail_url)
-                item.update(detail_data)
-                del item['_detail_url']
-            elif self.config.detail_page.get('url_field'):
-                # 从配置字段中获取详情页URL
-                url_field = self.config.detail_page['url_field']
-                if url_field in item and item[url_field]:
-                    detail_url = urljoin(self.config.base_url, item[url_field])
-                    detail_data = self.crawl_detail_page(detail_url)
-                    item.update(detail_data)
-
-            processed_items.append(item)
-
-        return processed_items
-
-    def _is_duplicate(self, item: Dict, existing_items: List[Dict]) -> bool:
-        """检查是否为重复数据"""
-        # 使用URL或标题作为唯一标识
-        unique_key = item.get('url') or item.get('title') or str(item)
-
-        for existing in existing_items:
-            existing_key = existing.get('url') or existing.get('title') or str(existing)
-            if unique_key == existing_key:
-                return True
-
-        return False
-    
-    def _has_next_page(self, html: str, current_page: int) -> bool:
-        """检查是否还有下一页"""
+            item.update(detail_data)
+
+        return items
+
+    def _has_next_page(self, page: Optional[Union[str, Tag]], current_page: int) -> bool:
+        """检查是否还有下一页
+
+        Args:
+            page: 页面HTML或已解析的文档树，为None时直接在浏览器中检查
+            current_page: 当前页码
+        """
         if not self.config.pagination:
             return False
         
-        soup = BeautifulSoup(html, 'html.parser')
-        
         # 检查下一页按钮是否存在
         next_selector = self.config.pagination.get('next_selector', '')
         if next_selector:
-            next_btn = soup.select_one(next_selector)
-            has_next = next_btn is not None and not next_btn.get('disabled')
+            if page is None:
+                found, disabled = self.driver.execute_script(NEXT_BUTTON_SCRIPT, next_selector)
+                has_next = found and not disabled
+            else:
+                next_btn = self.html_parser.parse(page).select_one(next_selector)
+                has_next = next_btn is not None and not next_btn.get('disabled')
             logger.debug(f"检查下一页按钮: {has_next}")
             return has_next
         
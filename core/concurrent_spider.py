@@ -4,22 +4,26 @@
 """
 
 import concurrent.futures
+import queue
 import threading
 import time
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 from urllib.parse import urljoin
 
 import logging
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
 from .base_spider import BaseSpider, SpiderConfig
+from .extraction import ExtractionPlan, JsEngineError, extract_in_browser
+from .http_detail import HttpDetailFetcher
+from .readiness import PageReadiness
 from utils.cookie_loader import CookieLoader
+from utils.html_parser import HtmlParser
 from utils.logger import get_logger
+from utils.page_archive import PageArchive
+from utils.resource_blocker import ResourceBlocker
 
 logger = get_logger(__name__)
 
@@ -29,9 +33,18 @@ class ConcurrentBrowserSpider(BaseSpider):
 
     def __init__(self, config: SpiderConfig):
         super().__init__(config)
-        self.thread_local_storage = threading.local()
+        # 驱动登记表：工作线程ID -> 该线程借出的驱动，爬取结束时由主线程统一归还
+        self._drivers: Dict[int, webdriver.Chrome] = {}
+        self._drivers_lock = threading.Lock()
         self.results_lock = threading.Lock()
         self.all_results = []
+        self.html_parser = HtmlParser.from_config(config)
+        self.plan = ExtractionPlan.from_config(config, default_url_field='product_url')
+        self.js_engine = self.plan.engine == 'js'
+        self.resource_blocker = ResourceBlocker.from_config(config)
+        self.readiness = PageReadiness.from_config(config, 'list')
+        self.detail_readiness = PageReadiness.from_config(config, 'detail')
+        self.http_detail = HttpDetailFetcher.from_spider(self)
 
     def _create_driver_instance(self) -> webdriver.Chrome:
         """创建单个浏览器实例"""
@@ -82,132 +95,121 @@ class ConcurrentBrowserSpider(BaseSpider):
             )
             chrome_options.add_argument(f'--user-agent={user_agent}')
 
+            # 资源拦截需要性能日志统计传输量
+            if self.resource_blocker:
+                ResourceBlocker.enable_logging(chrome_options)
+
+            # eager：DOMContentLoaded 后即返回，其余由就绪条件判断
+            chrome_options.page_load_strategy = self.readiness.page_load_strategy
+
             driver = webdriver.Chrome(options=chrome_options)
             driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             driver.set_window_size(1920, 1080)
-
-            # 设置页面加载超时
-            driver.set_page_load_timeout(self.config.timeout)
-
             return driver
         except Exception as e:
             logger.error(f"创建浏览器实例失败: {e}")
             raise
 
     def _get_driver(self) -> webdriver.Chrome:
-        """获取线程本地驱动"""
-        if not hasattr(self.thread_local_storage, 'driver'):
-            self.thread_local_storage.driver = self._create_driver_instance()
-
-            # 加载cookies
-            if self.config.cookies_file:
-                cookie_loader = CookieLoader(self.config.cookies_file)
-                cookies = cookie_loader.load()
-                if cookies:
-                    self.thread_local_storage.driver.get(self.config.base_url)
-                    time.sleep(2)
-                    for cookie in cookies:
-                        try:
-                            safe_cookie = {k: v for k, v in cookie.items()
-                                         if k in ['name', 'value', 'domain', 'path', 'secure', 'expiry']}
-                            self.thread_local_storage.driver.add_cookie(safe_cookie)
-                        except Exception as e:
-                            logger.warning(f"添加cookie失败: {e}")
-                    self.thread_local_storage.driver.refresh()
-                    time.sleep(2)
-
-        return self.thread_local_storage.driver
-
-    def _close_driver(self):
-        """关闭线程本地驱动"""
-        if hasattr(self.thread_local_storage, 'driver'):
-            self.thread_local_storage.driver.quit()
-            del self.thread_local_storage.driver
-
-    def _fetch_page_with_driver(self, url: str) -> str:
-        """使用线程本地驱动获取页面"""
-        driver = self._get_driver()
+        """获取当前线程的驱动，首次调用时从驱动池借出并登记"""
+        thread_id = threading.get_ident()
+        driver = self._drivers.get(thread_id)
+        if driver is not None:
+            return driver
+
+        driver = self.lease_driver(
+            ('concurrent', self.config.user_agent, self.config.proxy, self.resource_blocker is not None,
+             self.readiness.page_load_strategy),
+            self._create_driver_instance
+        )
+        with self._drivers_lock:
+            self._drivers[thread_id] = driver
+        driver.set_page_load_timeout(self.config.timeout)
+        if self.resource_blocker:
+            self.resource_blocker.apply(driver)
+
+        # 在访问第一个页面前注入cookies
+        if self.config.cookies_file:
+            if CookieLoader(self.config.cookies_file).apply_to_driver(driver, self.config.base_url):
+                self._login_pending = True
+
+        return driver
+
+    def _recycle_driver(self):
+        """当前线程的驱动访问页数或内存超过上限时退出，下一页重新借出"""
+        driver = self._drivers.get(threading.get_ident())
+        if driver is None or not self.driver_pool.should_recycle(driver):
+            return
+        with self._drivers_lock:
+            self._drivers.pop(threading.get_ident(), None)
+        self.return_driver(driver, discard=True)
+
+    def _release_drivers(self):
+        """归还登记表中所有线程的驱动，应在工作线程全部结束后调用"""
+        with self._drivers_lock:
+            drivers, self._drivers = list(self._drivers.values()), {}
+        for driver in drivers:
+            self.return_driver(driver)
+
+    def _audit_drivers(self, spawned_before: int, reaped_before: int, pooled_before: int):
+        """记录本次运行的驱动生命周期：启动、退出与放回驱动池的数量应当平衡"""
+        spawned = self.stats.get('drivers_spawned') - spawned_before
+        reaped = self.stats.get('drivers_reaped') - reaped_before
+        pooled = self.stats.get('drivers_pooled') - pooled_before
+        audit = self.driver_pool.audit()
+        logger.info(f"浏览器驱动: 启动 {spawned} 个，退出 {reaped} 个，放回驱动池 {pooled} 个；"
+                    f"驱动池空闲 {audit['idle']} 个，借出 {audit['leased']} 个，"
+                    f"累计强制结束残留进程 {audit['orphans_killed']} 个")
+        if not audit['process_audit']:
+            logger.info("未安装 psutil，未检查残留进程，driver_pool.max_rss_mb 不生效")
+        if self._drivers:
+            logger.warning(f"仍有 {len(self._drivers)} 个驱动未归还")
+
+    def _get_with_driver(self, driver: webdriver.Chrome, url: str):
+        """按主机限速后访问页面，并将加载耗时与登录重定向反馈给自适应限速"""
+        self.wait_for_slot(url)
+        started = time.monotonic()
+        self.driver_pool.count_page(driver)
         try:
-            logger.debug(f"线程 {threading.current_thread().name} 访问页面: {url}")
             driver.get(url)
-            time.sleep(self.config.delay)
-
-            # 等待特定元素加载
-            if self.config.list_page and 'wait_selector' in self.config.list_page:
-                WebDriverWait(driver, self.config.timeout).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, self.config.list_page['wait_selector'])
-                    )
-                )
-
-            return driver.page_source
+        except WebDriverException:
+            self.record_response(url, time.monotonic() - started, error=True)
+            raise
+        self.record_response(url, time.monotonic() - started,
+                             blocked=self.check_login(url, driver.current_url))
+        if self.resource_blocker:
+            self.resource_blocker.report(driver, url, self.stats)
+
+    def _load_with_driver(self, driver: webdriver.Chrome, url: str):
+        """访问页面并等待就绪，未就绪时抛出异常"""
+        logger.debug(f"线程 {threading.current_thread().name} 访问页面: {url}")
+        self._get_with_driver(driver, url)
+        if not self.readiness.wait(driver):
+            raise TimeoutException(f"页面未就绪: {url}")
+
+    def _navigate_with_driver(self, url: str):
+        """使用线程本地驱动访问页面并等待加载完成，超时等错误按重试策略重试
+
+        Returns:
+            webdriver.Chrome: 成功时返回驱动，失败时返回None
+        """
+        driver = self._get_driver()
+        try:
+            self.retry_policy.call(lambda: self._load_with_driver(driver, url), f"访问页面 {url}",
+                                   retry_on=(WebDriverException,))
+            return driver
         except Exception as e:
             logger.error(f"获取页面失败 {url}: {e}")
-            return ""
+            return None
 
-    def _extract_data_from_html(self, html: str, item_index: int) -> Dict:
-        """从HTML提取单个商品数据"""
-        soup = BeautifulSoup(html, 'html.parser')
-
-        if not self.config.list_page or 'fields' not in self.config.list_page:
-            return {}
-
-        # 获取所有商品项
-        item_selector = self.config.list_page.get('item_selector', '')
-        items = soup.select(item_selector)
-
-        if item_index >= len(items):
-            return {}
-
-        item = items[item_index]
-        record = {}
-
-        for field_config in self.config.list_page['fields']:
-            field_name = field_config['name']
-            selector = field_config.get('selector', '')
-            attribute = field_config.get('attribute', 'text')
-
-            value = self._extract_value_from_element(item, selector, attribute)
-            record[field_name] = value
-
-        # 提取详情页URL
-        if self.config.detail_page:
-            url_field = self.config.detail_page.get('url_field', 'url')
-            url_selector = None
-
-            # 查找详情页URL选择器
-            for field_config in self.config.list_page['fields']:
-                if field_config['name'] == url_field:
-                    url_selector = field_config.get('selector', '')
-                    break
-
-            if url_selector:
-                url_elem = item.select_one(url_selector)
-                if url_elem and url_elem.get('href'):
-                    detail_url = urljoin(self.config.base_url, url_elem['href'])
-                    record['_detail_url'] = detail_url
-
-        return record
-
-    def _extract_value_from_element(self, element, selector: str, attribute: str = 'text') -> str:
-        """从HTML元素中提取值"""
+    def _extract_in_browser(self, driver):
+        """使用浏览器内提取引擎提取列表数据，引擎不可用时返回None并改用页面解析"""
         try:
-            if selector:
-                elem = element.select_one(selector)
-                if not elem:
-                    return ''
-            else:
-                elem = element
-
-            if attribute == 'text':
-                return elem.get_text(strip=True)
-            elif attribute == 'html':
-                return str(elem)
-            else:
-                return elem.get(attribute, '')
-        except Exception as e:
-            logger.error(f"提取元素值失败: {e}")
-            return ''
+            return extract_in_browser(driver, self.plan)[2]
+        except JsEngineError as e:
+            logger.warning(f"浏览器内提取失败，改用页面解析: {e}")
+            self.js_engine = False
+            return None
 
     def _crawl_detail_page(self, detail_url: str) -> Dict:
         """爬取详情页"""
@@ -215,28 +217,29 @@ class ConcurrentBrowserSpider(BaseSpider):
             return {}
 
         try:
-            driver = self._get_driver()
-            driver.get(detail_url)
-            time.sleep(self.config.delay * 2)  # 详情页等待更长时间
-
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-
-            detail_data = {}
-            if 'fields' in self.config.detail_page:
-                for field_config in self.config.detail_page['fields']:
-                    field_name = field_config['name']
-                    selector = field_config.get('selector', '')
-                    attribute = field_config.get('attribute', 'text')
-
-                    value = self._extract_value_from_element(soup, selector, attribute)
-                    detail_data[field_name] = value
-
-            return detail_data
+            if self.replay:
+                html = self.replayed_page(detail_url) or ""
+            else:
+                driver = self._get_driver()
+                self._get_with_driver(driver, detail_url)
+                self.detail_readiness.wait(driver)
+
+                html = driver.page_source
+                self.record_page(detail_url, html, PageArchive.DETAIL)
+            soup = self.html_parser.parse(html)
+            return self.plan.extract_detail(soup)
         except Exception as e:
             logger.error(f"爬取详情页失败 {detail_url}: {e}")
             return {}
 
+    def _fetch_detail_http(self, detail_url: str) -> Optional[Dict]:
+        """启用 detail_page.fetcher = "http" 时用HTTP请求详情页，未启用或需要改用浏览器时返回None"""
+        if not self.http_detail or self.replay:
+            return None
+        detail = self.http_detail.fetch(detail_url)
+        self.stats.incr('detail_pages_http' if detail is not None else 'detail_pages_fallback')
+        return detail
+
     def _crawl_single_page(self, page_info: Dict) -> List[Dict]:
         """爬取单个页面"""
         page_num = page_info.get('page', 1)
@@ -246,123 +249,263 @@ class ConcurrentBrowserSpider(BaseSpider):
         logger.info(f"线程 {threading.current_thread().name} 处理第 {page_num} 页")
 
         try:
-            html = self._fetch_page_with_driver(url)
-            if not html:
-                return []
+            records = None
+            if self.replay:
+                html = self.replayed_page(url)
+                if html is None:
+                    return []
+            else:
+                driver = self._navigate_with_driver(url)
+                if not driver:
+                    return []
+                html = driver.page_source if self.recording else None
+                self.record_page(url, html)
 
-            soup = BeautifulSoup(html, 'html.parser')
+                # 优先在浏览器内提取，避免传输和解析整个页面
+                records = self._extract_in_browser(driver) if self.js_engine else None
 
-            # 获取所有商品项
-            item_selector = self.config.list_page.get('item_selector', '')
-            items = soup.select(item_selector)
+            if records is not None:
+                item_count = len(records)
+            else:
+                soup = self.html_parser.parse(html if html is not None else driver.page_source)
+                items = self.plan.select_items(soup)
+                item_count = len(items)
 
-            if not items:
+            if not item_count:
                 logger.warning(f"第 {page_num} 页未找到商品项")
                 return []
 
-            logger.info(f"第 {page_num} 页找到 {len(items)} 个商品项")
-
-            page_results = []
-            for i, item in enumerate(items):
-                if max_per_page > 0 and i >= max_per_page:
-                    break
-
-                record = {}
-                for field_config in self.config.list_page['fields']:
-                    field_name = field_config['name']
-                    selector = field_config.get('selector', '')
-                    attribute = field_config.get('attribute', 'text')
+            logger.info(f"第 {page_num} 页找到 {item_count} 个商品项")
 
-                    value = self._extract_value_from_element(item, selector, attribute)
-                    record[field_name] = value
-
-                # 提取详情页URL
-                if self.config.detail_page and self.config.detail_page.get('enabled', False):
-                    url_field = self.config.detail_page.get('url_field', 'product_url')
-                    url_selector = None
-
-                    for field_config in self.config.list_page['fields']:
-                        if field_config['name'] == url_field:
-                            url_selector = field_config.get('selector', '')
-                            break
-
-                    if url_selector:
-                        url_elem = item.select_one(url_selector)
-                        if url_elem and url_elem.get('href'):
-                            detail_url = urljoin(self.config.base_url, url_elem['href'])
-                            record['_detail_url'] = detail_url
-
-                page_results.append(record)
-
-            return page_results
+            if records is None:
+                if max_per_page > 0:
+                    items = items[:max_per_page]
+                records = [self.plan.extract_record(item) for item in items]
+            elif max_per_page > 0:
+                records = records[:max_per_page]
+            return records
 
         except Exception as e:
             logger.error(f"线程 {threading.current_thread().name} 处理第 {page_num} 页失败: {e}")
             return []
-
-    def crawl(self) -> List[Dict]:
-        """执行多线程爬取"""
+        finally:
+            if not self.replay:
+                self._recycle_driver()
+
+    def _build_pages(self) -> List[Dict]:
+        """生成待爬取的列表页"""
+        max_total_items = self.config.max_total_items or 0
+        pages = []
+        for page_num in range(1, self.config.max_pages + 1):
+            url = self.config.base_url
+            if page_num > 1 and self.config.pagination:
+                page_param = self.config.pagination.get('param', 'page')
+                separator = '&' if '?' in url else '?'
+                url = f"{url}{separator}{page_param}={page_num}"
+
+            max_per_page = max_total_items // self.config.max_pages if max_total_items > 0 else 0
+            pages.append({
+                'page': page_num,
+                'url': url,
+                'max_per_page': max_per_page
+            })
+        return pages
+
+    @property
+    def detail_enabled(self) -> bool:
+        return bool(self.config.detail_page and self.config.detail_page.get('enabled', False))
+
+    def _detail_url(self, record: Dict) -> Optional[str]:
+        """取出记录的详情页URL：提取时附带的链接，或 detail_page.url_field 字段"""
+        if '_detail_url' in record:
+            return record.pop('_detail_url')
+        url_field = self.config.detail_page.get('url_field')
+        if url_field and record.get(url_field):
+            return urljoin(self.config.base_url, record[url_field])
+        return None
+
+    @staticmethod
+    def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+        """放入有界队列，队列满时阻塞等待（背压），停止后放弃
+
+        Returns:
+            bool: 是否放入
+        """
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def iter_crawl(self) -> Iterator[Dict]:
+        """执行多线程爬取，按页面完成顺序产出去重后的记录"""
         logger.info(f"开始多线程浏览器爬虫: {self.config.name}")
         self.validate_config()
 
+        count = 0
+        self.dedup_index.clear()
+        audit_start = (self.stats.get('drivers_spawned'), self.stats.get('drivers_reaped'),
+                       self.stats.get('drivers_pooled'))
+        records = self._iter_pipeline() if self.detail_enabled else self._iter_list_pages()
         try:
-            max_total_items = self.config.max_total_items or 0
-            concurrent_workers = min(self.config.concurrent, 10)  # 限制最大并发数
-
-            # 准备页面列表
-            pages = []
-            for page_num in range(1, self.config.max_pages + 1):
-                url = self.config.base_url
-                if page_num > 1 and self.config.pagination:
-                    page_param = self.config.pagination.get('param', 'page')
-                    separator = '&' if '?' in url else '?'
-                    url = f"{url}{separator}{page_param}={page_num}"
-
-                max_per_page = max_total_items // self.config.max_pages if max_total_items > 0 else 0
-                pages.append({
-                    'page': page_num,
-                    'url': url,
-                    'max_per_page': max_per_page
-                })
-
-            # 使用线程池执行爬取
-            all_results = []
-            with concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_workers) as executor:
-                future_to_page = {executor.submit(self._crawl_single_page, page): page for page in pages}
-
-                for future in concurrent.futures.as_completed(future_to_page):
-                    page = future_to_page[future]
+            for record in self._take(records, self.config.max_total_items or 0):
+                yield record
+                count += 1
+        finally:
+            # 关闭数据源等待工作线程全部结束，再归还所有线程借出的驱动
+            records.close()
+            self._release_drivers()
+            if not self.replay:
+                self._audit_drivers(*audit_start)
+            logger.info(f"多线程爬取完成，共获取 {count} 条数据")
+
+    def _iter_list_pages(self) -> Iterator[Dict]:
+        """并发爬取列表页（未启用详情页）"""
+        concurrent_workers = min(self.config.concurrent, 10)  # 限制最大并发数
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_workers)
+        try:
+            future_to_page = {executor.submit(self._crawl_single_page, page): page
+                              for page in self._build_pages()}
+
+            for future in concurrent.futures.as_completed(future_to_page):
+                page = future_to_page[future]
+                try:
+                    page_results = future.result()
+                except Exception as e:
+                    logger.error(f"处理页面 {page['page']} 失败: {e}")
+                    continue
+
+                # 去重
+                yield from self.filter_known(self.dedup_index.filter_new(page_results))
+        finally:
+            # 取消未开始的页面，等待工作线程结束
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_pipeline(self) -> Iterator[Dict]:
+        """列表页、详情页两级流水线
+
+        列表页线程去重后将 (记录ID, 详情页URL) 放入有界队列，记录暂存在待合并表中；
+        详情页线程池（detail_page.concurrent，默认同 concurrent）从队列取出并爬取，
+        结果按记录ID合并后产出。队列满时列表页线程阻塞，内存占用不随页数增长。
+        """
+        list_workers = max(1, min(self.config.concurrent, 10))  # 限制最大并发数
+        detail_workers = max(1, min(self.config.detail_page.get('concurrent', self.config.concurrent), 10))
+        queue_size = self.config.detail_page.get('queue_size', detail_workers * 4)
+
+        pages = self._build_pages()
+        if not pages:
+            return
+        detail_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        # 已完成的数据：(记录ID, 详情页数据)，记录ID为None时为无需详情页的完整记录
+        done_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        pending: Dict[bytes, Dict] = {}
+        stop = threading.Event()
+        lists_left = [len(pages)]
+        started = time.monotonic()
+        stage_time = {}
+
+        def list_stage(page: Dict):
+            try:
+                records = self._crawl_single_page(page)
+                # 详情页走HTTP时沿用列表页浏览器最新的cookies
+                driver = self._drivers.get(threading.get_ident())
+                if self.http_detail and driver is not None:
+                    self.http_detail.sync_from_driver(driver)
+                with self.results_lock:
+                    records = self.dedup_index.filter_new(records)
+                self.stats.incr('list_pages_crawled')
+                for record in self.filter_known(records):
+                    detail_url = self._detail_url(record)
+                    if detail_url is None:
+                        if not self._put(done_queue, (None, record), stop):
+                            return
+                        continue
+                    item_id = self.dedup_index.digest(record)
+                    with self.results_lock:
+                        pending[item_id] = record
+                    if not self._put(detail_queue, (item_id, detail_url), stop):
+                        return
+            finally:
+                # 最后一个列表页线程结束时通知详情页线程退出
+                with self.results_lock:
+                    lists_left[0] -= 1
+                    last = lists_left[0] == 0
+                if last:
+                    stage_time['list'] = time.monotonic() - started
+                    for _ in range(detail_workers):
+                        self._put(detail_queue, None, stop)
+
+        def detail_stage():
+            try:
+                while not stop.is_set():
                     try:
-                        page_results = future.result()
-                        with self.results_lock:
-                            all_results.extend(page_results)
-
-                            # 检查是否达到总量
-                            if max_total_items > 0 and len(all_results) >= max_total_items:
-                                logger.info(f"已达到最大数据量 {max_total_items}")
-                                break
-                    except Exception as e:
-                        logger.error(f"处理页面 {page['page']} 失败: {e}")
-
-            # 去重
-            seen = set()
-            unique_results = []
-            for item in all_results:
-                key = str(item.get('url', '')) + str(item.get('title', ''))
-                if key not in seen:
-                    seen.add(key)
-                    unique_results.append(item)
-
-            if max_total_items > 0:
-                unique_results = unique_results[:max_total_items]
-
-            logger.info(f"多线程爬取完成，共获取 {len(unique_results)} 条数据")
-            return unique_results
-
+                        task = detail_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if task is None:
+                        return
+                    item_id, detail_url = task
+                    detail = self._fetch_detail_http(detail_url)
+                    if detail is None:
+                        try:
+                            detail = self._crawl_detail_page(detail_url)
+                        finally:
+                            if not self.replay:
+                                self._recycle_driver()
+                    self.stats.incr('detail_pages_crawled')
+                    if not self._put(done_queue, (item_id, detail), stop):
+                        return
+            finally:
+                stage_time['detail'] = time.monotonic() - started
+
+        list_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=list_workers, thread_name_prefix='list')
+        detail_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=detail_workers, thread_name_prefix='detail')
+        logger.info(f"详情页流水线: 列表页线程 {list_workers} 个，详情页线程 {detail_workers} 个，队列长度 {queue_size}")
+        try:
+            for page in pages:
+                list_executor.submit(list_stage, page)
+            detail_futures = [detail_executor.submit(detail_stage) for _ in range(detail_workers)]
+
+            while True:
+                try:
+                    item_id, data = done_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if all(future.done() for future in detail_futures) and done_queue.empty():
+                        break
+                    continue
+                if item_id is None:
+                    yield data
+                    continue
+                with self.results_lock:
+                    record = pending.pop(item_id)
+                record.update(data)
+                yield record
         finally:
-            # 关闭所有线程本地驱动
-            self._close_driver()
+            # 提前结束时解除队列阻塞，取消未开始的页面，等待两级线程结束
+            stop.set()
+            list_executor.shutdown(wait=True, cancel_futures=True)
+            detail_executor.shutdown(wait=True)
+            if self.http_detail:
+                self.http_detail.close()
+            self._report_throughput(stage_time)
+
+    def _report_throughput(self, stage_time: Dict[str, float]):
+        """记录流水线各级吞吐量（页/秒）"""
+        for stage in ('list', 'detail'):
+            crawled = self.stats.get(f'{stage}_pages_crawled')
+            elapsed = stage_time.get(stage)
+            if crawled and elapsed:
+                self.stats.set(f'{stage}_pages_per_sec', round(crawled / elapsed, 2))
+        logger.info(f"流水线吞吐量: 列表页 {self.stats.get('list_pages_crawled')} 页 "
+                    f"({self.stats.get('list_pages_per_sec')} 页/秒)，"
+                    f"详情页 {self.stats.get('detail_pages_crawled')} 页 "
+                    f"({self.stats.get('detail_pages_per_sec')} 页/秒)")
 
     def __del__(self):
-        """析构函数，确保资源清理"""
-        self._close_driver()
\ No newline at end of file
+        """析构函数，确保未归还的驱动被退出"""
+        if getattr(self, '_drivers', None):
+            self._release_drivers()
\ No newline at end of file
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+提取计划 - 将 list_page / detail_page 字段配置预编译为不可变的执行计划
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4.element import Tag
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 列表页提取引擎
+ENGINES = ('soup', 'js')
+
+
+def _compile_selector(selector: str):
+    """预编译CSS选择器，编译失败时返回None"""
+    if not selector:
+        return None
+    try:
+        return soupsieve.compile(selector)
+    except Exception as e:
+        logger.error(f"CSS选择器无效 '{selector}': {e}")
+        return None
+
+
+def _unique_names(fields) -> Tuple[str, ...]:
+    """按出现顺序去重的字段名"""
+    return tuple(dict.fromkeys(field.name for field in fields))
+
+
+def _bind_getter(attribute: str) -> Callable[[Tag], Any]:
+    """根据属性类型预绑定取值函数"""
+    if attribute == 'text':
+        return lambda elem: elem.get_text(strip=True)
+    if attribute == 'html':
+        return str
+    return lambda elem: elem.get(attribute, '')
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """单个HTML字段的提取计划"""
+    name: str
+    selector: str
+    attribute: str
+    matcher: Any  # 预编译的选择器，未配置选择器时为None
+    getter: Callable[[Tag], Any]
+
+    @classmethod
+    def from_config(cls, field_config: Dict) -> 'FieldPlan':
+        selector = field_config.get('selector', '')
+        attribute = field_config.get('attribute', 'text')
+        return cls(
+            name=field_config['name'],
+            selector=selector,
+            attribute=attribute,
+            matcher=_compile_selector(selector),
+            getter=_bind_getter(attribute),
+        )
+
+    def extract(self, element: Tag) -> Any:
+        """从元素中提取字段值"""
+        try:
+            if self.selector:
+                if self.matcher is None:
+                    return ''
+                elem = self.matcher.select_one(element)
+                if elem is None:
+                    return ''
+            else:
+                elem = element
+            return self.getter(elem)
+        except Exception as e:
+            logger.error(f"提取元素值失败: {e}")
+            return ''
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    """HTML页面的提取计划
+
+    在爬虫创建时由 SpiderConfig 编译一次，之后每个列表项只执行预编译的选择器与取值函数。
+    """
+    base_url: str
+    item_selector: str
+    item_matcher: Any
+    fields: Tuple[FieldPlan, ...]
+    detail_fields: Tuple[FieldPlan, ...]
+    detail_url_selector: str
+    detail_url_matcher: Any  # 详情页链接选择器，未启用详情页时为None
+    engine: str  # 列表提取引擎：soup（Python端解析）或 js（浏览器内提取）
+
+    @classmethod
+    def from_config(cls, config, default_url_field: str = '') -> 'ExtractionPlan':
+        """
+        Args:
+            config: 爬虫配置
+            default_url_field: 未配置 detail_page.url_field 时使用的字段名，为空表示只使用 url_selector
+        """
+        list_page = config.list_page or {}
+        detail_page = config.detail_page or {}
+        fields = tuple(FieldPlan.from_config(f) for f in list_page.get('fields', []))
+
+        # 预先确定详情页链接选择器：优先 url_selector，其次 url_field 对应的 href 字段的选择器
+        detail_url_selector = ''
+        if detail_page.get('enabled', False):
+            detail_url_selector = list_page.get('url_selector', '')
+            url_field = detail_page.get('url_field', default_url_field)
+            if not detail_url_selector and url_field:
+                detail_url_selector = next(
+                    (f.selector for f in fields if f.name == url_field and f.attribute == 'href'), ''
+                )
+
+        engine = list_page.get('engine', 'soup')
+        if engine not in ENGINES:
+            raise ValueError(f"不支持的提取引擎: {engine}")
+        # 浏览器的 outerHTML 与 BeautifulSoup 的序列化结果不同，html 字段只能在Python端提取
+        if engine == 'js' and any(f.attribute == 'html' for f in fields):
+            logger.warning("浏览器内提取不支持 html 字段，改用页面解析")
+            engine = 'soup'
+
+        item_selector = list_page.get('item_selector', '')
+        return cls(
+            base_url=config.base_url,
+            item_selector=item_selector,
+            item_matcher=_compile_selector(item_selector),
+            fields=fields,
+            detail_fields=tuple(FieldPlan.from_config(f) for f in detail_page.get('fields', [])),
+            detail_url_selector=detail_url_selector,
+            detail_url_matcher=_compile_selector(detail_url_selector),
+            engine=engine,
+        )
+
+    @property
+    def has_fields(self) -> bool:
+        return bool(self.fields)
+
+    @property
+    def output_fields(self) -> Tuple[str, ...]:
+        """输出字段名：列表页字段在前，详情页字段在后"""
+        return _unique_names(self.fields + self.detail_fields)
+
+    @property
+    def js_fields(self) -> List[Dict]:
+        """传给浏览器内提取脚本的字段描述"""
+        return [
+            {'name': f.name, 'selector': f.selector, 'attribute': f.attribute}
+            for f in self.fields
+        ]
+
+    def select_items(self, soup: Tag) -> List[Tag]:
+        """选出所有列表项，未配置 item_selector 时整个文档视为一项"""
+        if not self.item_selector:
+            return [soup]
+        if self.item_matcher is None:
+            return []
+        return self.item_matcher.select(soup)
+
+    def extract_record(self, item: Tag) -> Dict:
+        """提取单个列表项的字段，并附带详情页链接"""
+        record = {field.name: field.extract(item) for field in self.fields}
+        if self.detail_url_matcher is not None:
+            url_elem = self.detail_url_matcher.select_one(item)
+            if url_elem is not None and url_elem.get('href'):
+                record['_detail_url'] = urljoin(self.base_url, url_elem['href'])
+        return record
+
+    def extract_items(self, soup: Tag) -> List[Dict]:
+        """提取页面中所有列表项"""
+        return [self.extract_record(item) for item in self.select_items(soup)]
+
+    def extract_detail(self, soup: Tag) -> Dict:
+        """提取详情页字段"""
+        return {field.name: field.extract(soup) for field in self.detail_fields}
+
+
+# 在页面内执行提取计划，返回 {total, start, records}，选择器不被浏览器支持时返回 {error}
+# 取值规则与 FieldPlan 保持一致：text 拼接去除首尾空白的各文本节点，多值属性返回列表；不支持 html 字段
+JS_EXTRACT_SCRIPT = """
+var itemSelector = arguments[0], fields = arguments[1], urlSelector = arguments[2], start = arguments[3];
+var MULTI_VALUED = {'class': 1, 'rel': 1, 'rev': 1, 'accept-charset': 1, 'headers': 1, 'accesskey': 1, 'dropzone': 1};
+var SKIP_TEXT = {'SCRIPT': 1, 'STYLE': 1, 'TEMPLATE': 1};
+function text(el) {
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, null), node, parts = [];
+    while ((node = walker.nextNode())) {
+        if (node.parentNode && SKIP_TEXT[node.parentNode.nodeName]) continue;
+        var value = node.nodeValue.trim();
+        if (value) parts.push(value);
+    }
+    return parts.join('');
+}
+function value(el, attribute) {
+    if (attribute === 'text') return text(el);
+    var attr = el.getAttribute(attribute);
+    if (attr === null) return '';
+    if (MULTI_VALUED[attribute]) return attr.split(/\\s+/).filter(function (v) { return v; });
+    return attr;
+}
+try {
+    var items = itemSelector ? document.querySelectorAll(itemSelector) : [document.documentElement];
+    if (start > items.length) start = 0;
+    var records = [];
+    for (var i = start; i < items.length; i++) {
+        var item = items[i], record = {};
+        for (var j = 0; j < fields.length; j++) {
+            var field = fields[j];
+            var el = field.selector ? item.querySelector(field.selector) : item;
+            record[field.name] = el ? value(el, field.attribute) : '';
+        }
+        if (urlSelector) {
+            var link = item.querySelector(urlSelector);
+            var href = link ? link.getAttribute('href') : null;
+            if (href) record._detail_url = href;
+        }
+        records.push(record);
+    }
+    return {total: items.length, start: start, records: records};
+} catch (e) {
+    return {error: String(e)};
+}
+"""
+
+
+class JsEngineError(Exception):
+    """浏览器内提取失败（如使用了浏览器不支持的选择器）"""
+
+
+def extract_in_browser(driver, plan: ExtractionPlan, start: int = 0) -> Tuple[int, int, List[Dict]]:
+    """在浏览器内执行提取计划，只回传JSON记录而不传输整个页面HTML
+
+    Args:
+        driver: WebDriver实例
+        plan: 提取计划
+        start: 从第几个列表项开始提取
+
+    Returns:
+        Tuple[int, int, List[Dict]]: (列表项总数, 实际起始序号, 记录列表)
+
+    Raises:
+        JsEngineError: 脚本执行失败
+    """
+    result = driver.execute_script(
+        JS_EXTRACT_SCRIPT, plan.item_selector, plan.js_fields, plan.detail_url_selector, start
+    )
+    if not isinstance(result, dict) or 'error' in result:
+        raise JsEngineError(result.get('error') if isinstance(result, dict) else result)
+
+    records = result['records']
+    for record in records:
+        if '_detail_url' in record:
+            record['_detail_url'] = urljoin(plan.base_url, record['_detail_url'])
+    return result['total'], result['start'], records
+
+
+def _json_value_to_str(value: Any) -> str:
+    """将JSON值转换为字符串"""
+    if value is None:
+        return ''
+    elif isinstance(value, (str, int, float)):
+        return str(value)
+    elif isinstance(value, dict):
+        # 如果值是dict，尝试获取text字段（知乎的新格式）
+        if 'text' in value:
+            return str(value['text'])
+        else:
+            # 保持标准库的分隔符，字段值与截断位置不随JSON后端变化
+            return json.dumps(value, ensure_ascii=False)[:100]
+    elif isinstance(value, list):
+        return ','.join(map(str, value))
+    else:
+        return str(value)
+
+
+def _resolve_path(data: Any, path: Tuple[str, ...]) -> Any:
+    """按预拆分的键路径访问嵌套字段，路径不存在时返回None"""
+    for key in path:
+        if isinstance(data, dict) and key in data:
+            data = data[key]
+        else:
+            return None
+    return data
+
+
+@dataclass(frozen=True)
+class JsonFieldPlan:
+    """单个JSON字段的提取计划，点语法路径预先拆分"""
+    name: str
+    path: Tuple[str, ...]
+
+    @classmethod
+    def from_config(cls, field_config: Dict) -> 'JsonFieldPlan':
+        selector = field_config.get('selector', '')
+        return cls(name=field_config['name'], path=tuple(selector.split('.')) if selector else ())
+
+    def extract(self, data: Any) -> str:
+        if not self.path or not isinstance(data, dict):
+            return ''
+        return _json_value_to_str(_resolve_path(data, self.path))
+
+
+@dataclass(frozen=True)
+class JsonExtractionPlan:
+    """JSON接口的提取计划"""
+    list_path: Tuple[str, ...]
+    fields: Tuple[JsonFieldPlan, ...]
+    detail_fields: Tuple[JsonFieldPlan, ...]
+
+    @classmethod
+    def from_config(cls, config) -> 'JsonExtractionPlan':
+        list_page = config.list_page or {}
+        detail_page = config.detail_page or {}
+        list_selector = list_page.get('list_selector', '')
+        return cls(
+            list_path=tuple(list_selector.split('.')) if list_selector else (),
+            fields=tuple(JsonFieldPlan.from_config(f) for f in list_page.get('fields', [])),
+            detail_fields=tuple(JsonFieldPlan.from_config(f) for f in detail_page.get('fields', [])),
+        )
+
+    @property
+    def has_fields(self) -> bool:
+        return bool(self.fields)
+
+    @property
+    def output_fields(self) -> Tuple[str, ...]:
+        """输出字段名：列表页字段在前，详情页字段在后"""
+        return _unique_names(self.fields + self.detail_fields)
+
+    def select_items(self, data: Any) -> List:
+        """按 list_selector 取出数据列表"""
+        items = data
+        if self.list_path:
+            items = _resolve_path(data, self.list_path)
+            if items is None:
+                items = []
+        if not isinstance(items, list):
+            items = [items] if items else []
+        return items
+
+    def extract_record(self, item: Any) -> Dict:
+        return {field.name: field.extract(item) for field in self.fields}
+
+    def extract_items(self, data: Any) -> List[Dict]:
+        return [self.extract_record(item) for item in self.select_items(data)]
+
+    def extract_detail(self, data: Any) -> Dict:
+        return {field.name: field.extract(data) for field in self.detail_fields}
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP详情页获取 - 浏览器爬取列表页，服务端渲染的详情页直接用HTTP请求获取
+"""
+
+import concurrent.futures
+import time
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.autothrottle import is_login_redirect
+from utils.logger import get_logger
+from utils.page_archive import PageArchive
+
+logger = get_logger(__name__)
+
+
+class HttpDetailFetcher:
+    """HTTP详情页获取器（detail_page.fetcher = "http"）
+
+    复制浏览器当前的cookies与User-Agent到带连接池的 requests 会话，并发请求详情页，
+    使用 detail_page.fields 解析。以下情况返回None，由调用方改用浏览器获取该URL：
+      - 请求失败或状态码 >= 400
+      - 被重定向到登录/验证页面
+      - 空壳页面：缺少 detail_page.wait_selector，或所有字段均为空（内容由JS渲染）
+    请求同样经过按主机限速、自适应限速与重试策略。
+    """
+
+    def __init__(self, spider, workers: int = 4):
+        """
+        Args:
+            spider: 所属的浏览器爬虫，提供配置、限速、重试与解析
+            workers: 并发请求数，同时也是连接池大小
+        """
+        self.spider = spider
+        self.config = spider.config
+        self.workers = max(1, workers)
+        self.wait_selector = (self.config.detail_page or {}).get('wait_selector')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+        })
+        if self.config.headers:
+            self.session.headers.update(self.config.headers)
+        if self.config.proxy:
+            self.session.proxies = {'http': self.config.proxy, 'https': self.config.proxy}
+
+    @classmethod
+    def from_spider(cls, spider) -> Optional['HttpDetailFetcher']:
+        """根据爬虫配置创建获取器（读取 detail_page.fetcher / http_workers），未启用时返回None"""
+        detail_page = spider.config.detail_page or {}
+        if not detail_page.get('enabled', False) or detail_page.get('fetcher', 'browser') == 'browser':
+            return None
+        if detail_page['fetcher'] != 'http':
+            raise ValueError(f"不支持的详情页获取方式: {detail_page['fetcher']}")
+        workers = detail_page.get('concurrent', spider.config.concurrent)
+        return cls(spider, detail_page.get('http_workers', max(workers, 4)))
+
+    def sync_from_driver(self, driver):
+        """复制浏览器当前的cookies与User-Agent到会话"""
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent")
+            cookies = driver.get_cookies()
+        except Exception as e:
+            logger.warning(f"读取浏览器cookies失败: {e}")
+            return
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+        logger.debug(f"已同步浏览器cookies到HTTP会话: {len(cookies)} 个")
+
+    def _request(self, url: str) -> requests.Response:
+        """按主机限速后发出GET请求"""
+        self.spider.wait_for_slot(url)
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=self.config.timeout)
+        except requests.RequestException:
+            self.spider.record_response(url, time.monotonic() - started, error=True)
+            raise
+        self.spider.record_response(url, time.monotonic() - started, response.status_code,
+                                    blocked=is_login_redirect(url, response.url))
+        return response
+
+    def fetch(self, url: str) -> Optional[Dict]:
+        """请求并解析详情页
+
+        Returns:
+            Optional[Dict]: 详情页字段，需要改用浏览器获取时返回None
+        """
+        try:
+            response = self.spider.retry_policy.call(
+                lambda: self._request(url), f"请求详情页 {url}",
+                retry_on=(requests.ConnectionError, requests.Timeout)
+            )
+        except Exception as e:
+            logger.debug(f"HTTP获取详情页失败，改用浏览器 {url}: {e}")
+            return None
+
+        if response.status_code >= 400:
+            logger.debug(f"HTTP获取详情页状态码 {response.status_code}，改用浏览器: {url}")
+            return None
+        if is_login_redirect(url, response.url):
+            logger.debug(f"HTTP获取详情页被重定向到 {response.url}，改用浏览器: {url}")
+            return None
+
+        soup = self.spider.html_parser.parse(response.text)
+        if self.wait_selector and soup.select_one(self.wait_selector) is None:
+            logger.debug(f"详情页缺少 {self.wait_selector}，改用浏览器: {url}")
+            return None
+        detail = self.spider.plan.extract_detail(soup)
+        if detail and not any(detail.values()):
+            logger.debug(f"详情页字段均为空，改用浏览器: {url}")
+            return None
+
+        self.spider.record_page(url, response.text, PageArchive.DETAIL)
+        return detail
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """并发请求多个详情页
+
+        Returns:
+            Dict[str, Optional[Dict]]: URL -> 详情页字段，需要改用浏览器获取的为None
+        """
+        urls = list(dict.fromkeys(urls))
+        if len(urls) <= 1:
+            return {url: self.fetch(url) for url in urls}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self.fetch, urls)))
+
+    def close(self):
+        """关闭会话及其连接池"""
+        self.session.close()
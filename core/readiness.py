@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+页面就绪判断 - 用可组合的就绪条件代替访问页面后的固定等待
+"""
+
+import time
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 一次调用返回所有就绪条件需要的页面状态：
+# [readyState, 选择器是否存在, 列表项数量, 距最近一个资源加载完成的毫秒数]
+READY_STATE_SCRIPT = """
+var selector = arguments[0], itemSelector = arguments[1];
+if (!window.__readinessBuffer && performance.setResourceTimingBufferSize) {
+    performance.setResourceTimingBufferSize(5000);
+    window.__readinessBuffer = true;
+}
+var entries = performance.getEntriesByType('resource');
+var last = 0;
+for (var i = 0; i < entries.length; i++) {
+    if (entries[i].responseEnd > last) last = entries[i].responseEnd;
+}
+return [
+    document.readyState,
+    selector ? document.querySelector(selector) !== null : true,
+    itemSelector ? document.querySelectorAll(itemSelector).length : -1,
+    performance.now() - last
+];
+"""
+
+
+class PageReadiness:
+    """页面就绪条件
+
+    条件可以组合，全部满足时立即返回，不做固定等待：
+      - DOMContentLoaded：document.readyState 不再是 loading（配合 pageLoadStrategy=eager，
+        driver.get 在 DOMContentLoaded 后即返回）
+      - selector：等待元素出现，超时视为页面未就绪
+      - stable_ms：列表项数量连续 stable_ms 毫秒不变
+      - idle_ms：网络空闲，最近 idle_ms 毫秒内没有资源加载完成（基于 Resource Timing，近似判断）
+    后两个条件为稳定条件，在 settle_timeout 内未满足时照常返回。
+    请求频率由限速器控制，与就绪判断无关。
+    """
+
+    def __init__(self, selector: Optional[str] = None, item_selector: Optional[str] = None,
+                 stable_ms: int = 0, idle_ms: int = 0, timeout: float = 30, settle_timeout: float = 5,
+                 poll_interval: float = 0.1, page_load_strategy: str = 'eager'):
+        """
+        Args:
+            selector: 必须出现的元素选择器
+            item_selector: 列表项选择器，用于判断数量稳定
+            stable_ms: 列表项数量保持不变的毫秒数，0表示不检查
+            idle_ms: 网络空闲的毫秒数，0表示不检查
+            timeout: 等待 DOMContentLoaded 与 selector 的秒数
+            settle_timeout: 等待稳定条件的秒数
+            poll_interval: 轮询间隔（秒）
+            page_load_strategy: 浏览器页面加载策略：eager, normal
+        """
+        if page_load_strategy not in ('eager', 'normal'):
+            raise ValueError(f"不支持的页面加载策略: {page_load_strategy}")
+        self.selector = selector
+        self.item_selector = item_selector
+        self.stable_ms = stable_ms if item_selector else 0
+        self.idle_ms = idle_ms
+        self.timeout = timeout
+        self.settle_timeout = settle_timeout
+        self.poll_interval = poll_interval
+        self.page_load_strategy = page_load_strategy
+
+    @classmethod
+    def from_config(cls, config, page: str = 'list') -> 'PageReadiness':
+        """根据爬虫配置创建就绪条件（读取 readiness 与 list_page / detail_page 的 wait_selector）
+
+        Args:
+            config: 爬虫配置
+            page: 页面类型：list, detail
+        """
+        options = getattr(config, 'readiness', None) or {}
+        page_config = (config.list_page if page == 'list' else config.detail_page) or {}
+        item_selector = page_config.get('item_selector') if page == 'list' else None
+        return cls(
+            selector=page_config.get('wait_selector'),
+            item_selector=item_selector,
+            stable_ms=options.get('stable_ms', 300),
+            idle_ms=options.get('idle_ms', 500),
+            timeout=options.get('timeout', config.timeout),
+            settle_timeout=options.get('settle_timeout', 5),
+            page_load_strategy=options.get('page_load_strategy', 'eager'),
+        )
+
+    def _state(self, driver):
+        return driver.execute_script(READY_STATE_SCRIPT, self.selector, self.item_selector)
+
+    def item_count(self, driver) -> int:
+        """当前列表项数量，未配置列表项选择器时返回-1"""
+        if not self.item_selector:
+            return -1
+        return self._state(driver)[2]
+
+    def wait(self, driver) -> bool:
+        """访问页面后等待就绪
+
+        Returns:
+            bool: DOMContentLoaded 与 selector 是否在超时前满足
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            ready_state, present, _, _ = self._state(driver)
+            if ready_state != 'loading' and present:
+                break
+            if time.monotonic() >= deadline:
+                logger.debug(f"页面未就绪: readyState={ready_state}, 选择器{'已' if present else '未'}出现")
+                return False
+            time.sleep(self.poll_interval)
+
+        self.settle(driver)
+        logger.debug(f"页面就绪，耗时 {time.monotonic() - started:.2f}s")
+        return True
+
+    def settle(self, driver, more_than: int = -1) -> bool:
+        """等待列表项数量稳定、网络空闲（滚动、点击加载更多之后调用）
+
+        Args:
+            driver: 浏览器驱动
+            more_than: 列表项数量需先超过该值（操作前的数量），-1表示不要求
+
+        Returns:
+            bool: 是否在 settle_timeout 内满足全部稳定条件
+        """
+        if not (self.stable_ms or self.idle_ms or (more_than >= 0 and self.item_selector)):
+            return True
+
+        deadline = time.monotonic() + self.settle_timeout
+        last_count = None
+        changed_at = time.monotonic()
+        while True:
+            _, _, count, idle = self._state(driver)
+            now = time.monotonic()
+            if count != last_count:
+                last_count, changed_at = count, now
+
+            grown = more_than < 0 or count < 0 or count > more_than
+            stable = not self.stable_ms or (now - changed_at) * 1000 >= self.stable_ms
+            quiet = not self.idle_ms or idle >= self.idle_ms
+            if grown and stable and quiet:
+                return True
+            if now >= deadline:
+                logger.debug(f"等待页面稳定超时: 列表项 {count} 个，网络空闲 {idle:.0f}ms")
+                return False
+            time.sleep(self.poll_interval)
@@ -5,6 +5,7 @@
 
 from .base_spider import SpiderConfig
 from .api_spider import ApiSpider
+from .async_api_spider import AsyncApiSpider
 from .browser_spider import BrowserSpider
 from .concurrent_spider import ConcurrentBrowserSpider
 from utils.logger import get_logger
@@ -38,6 +39,8 @@ class SpiderFactory:
             # 根据模式创建相应的爬虫
             if config.mode == 'api':
                 return ApiSpider(config)
+            elif config.mode == 'api_async':
+                return AsyncApiSpider(config)
             elif config.mode == 'browser':
                 # 如果配置了并发数大于1，使用并发爬虫
                 if getattr(config, 'concurrent', 1) > 1:
@@ -4,19 +4,24 @@
 """
 
 import os
-import json
 import time
 import concurrent.futures
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import threading
 
-from .base_spider import SpiderConfig
+from .base_spider import BaseSpider
 from .spider_factory import SpiderFactory
+from utils import json_codec
+from utils.driver_pool import get_driver_pool
 from utils.logger import get_logger
+from utils.record_writer import RecordWriter, open_writer
 
 logger = get_logger(__name__)
 
+# 每写入这么多条记录后落盘，并将其标记为已见
+SEEN_BATCH_SIZE = 500
+
 
 class SpiderManager:
     """爬虫管理器类"""
@@ -36,8 +41,15 @@ class SpiderManager:
             configs.append(file.stem)
         return configs
 
-    def run_single_spider(self, config_name: str, save_results: bool = True) -> Dict:
-        """运行单个爬虫"""
+    def run_single_spider(self, config_name: str, save_results: bool = True,
+                          reset_seen: bool = False, record_dir: Optional[str] = None,
+                          replay_dir: Optional[str] = None) -> Dict:
+        """运行单个爬虫
+
+        Args:
+            record_dir: 录制抓取到的页面到该目录
+            replay_dir: 从该目录的存档重放页面，不访问网络
+        """
         try:
             config_path = self.config_dir / f"{config_name}.json"
             if not config_path.exists():
@@ -50,21 +62,36 @@ class SpiderManager:
             if not spider.config.output_path:
                 spider.config.output_path = str(self.output_dir / f"{config_name}_{int(time.time())}")
 
-            # 运行爬虫
-            results = spider.crawl()
-
-            # 保存结果
-            if save_results:
-                self._save_results(results, spider.config)
-
-            logger.info(f"爬虫 {config_name} 完成，共获取 {len(results)} 条数据")
+            # 重置跨运行去重记录
+            if reset_seen:
+                spider.reset_seen_store()
+
+            # 录制或重放页面存档
+            if replay_dir:
+                spider.open_archive(replay_dir, replay=True)
+            elif record_dir:
+                spider.open_archive(record_dir)
+
+            # 运行爬虫，保存结果时边爬取边写入，不在内存中保留结果
+            writer = self.open_writer(spider) if save_results else None
+            try:
+                data_count, results = self.consume(spider, writer, mark_seen=not replay_dir)
+            finally:
+                spider.close_archive()
+                spider.close_seen_store()
+
+            stats = spider.stats.as_dict()
+            logger.info(f"爬虫 {config_name} 完成，共获取 {data_count} 条数据")
+            if stats:
+                logger.info(f"爬虫 {config_name} 运行统计: {stats}")
 
             return {
                 "config_name": config_name,
                 "status": "success",
-                "data_count": len(results),
+                "data_count": data_count,
                 "results": results,
-                "output_path": spider.config.output_path
+                "output_path": str(writer.path) if writer else spider.config.output_path,
+                "stats": stats
             }
 
         except Exception as e:
@@ -78,14 +105,20 @@ class SpiderManager:
             }
 
     def run_multiple_spiders(self, config_names: List[str], max_workers: int = 3,
-                           save_results: bool = True) -> Dict[str, Dict]:
-        """并行运行多个爬虫"""
+                           save_results: bool = True, reset_seen: bool = False,
+                           record_dir: Optional[str] = None, replay_dir: Optional[str] = None) -> Dict[str, Dict]:
+        """并行运行多个爬虫
+
+        浏览器爬虫从进程内共享的驱动池借用驱动，前一个爬虫归还的浏览器由后续启动参数相同的爬虫复用，
+        全部运行完成后关闭空闲驱动。
+        """
         logger.info(f"开始并行运行 {len(config_names)} 个爬虫")
 
         results = {}
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_config = {
-                executor.submit(self.run_single_spider, config_name, save_results): config_name
+                executor.submit(self.run_single_spider, config_name, save_results, reset_seen,
+                                record_dir, replay_dir): config_name
                 for config_name in config_names
             }
 
@@ -104,17 +137,20 @@ class SpiderManager:
                         "results": []
                     }
 
+        get_driver_pool().close()
         logger.info(f"所有爬虫运行完成")
         return results
 
-    def run_all_spiders(self, save_results: bool = True) -> Dict[str, Dict]:
+    def run_all_spiders(self, save_results: bool = True, reset_seen: bool = False,
+                        record_dir: Optional[str] = None, replay_dir: Optional[str] = None) -> Dict[str, Dict]:
         """运行所有配置的爬虫"""
         configs = self.list_configs()
         if not configs:
             logger.warning("未找到任何配置文件")
             return {}
 
-        return self.run_multiple_spiders(configs, save_results=save_results)
+        return self.run_multiple_spiders(configs, save_results=save_results, reset_seen=reset_seen,
+                                         record_dir=record_dir, replay_dir=replay_dir)
 
     def create_config_template(self, name: str, template_type: str = "jd") -> str:
         """创建配置文件模板"""
@@ -208,33 +244,62 @@ class SpiderManager:
         config_path = self.config_dir / f"{name}.json"
 
         with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+            json_codec.dump(config, f, indent=True)
 
         logger.info(f"已创建配置文件: {config_path}")
         return str(config_path)
 
-    def _save_results(self, results: List[Dict], config: SpiderConfig):
-        """保存结果到文件"""
+    @staticmethod
+    def open_writer(spider: BaseSpider) -> RecordWriter:
+        """按爬虫配置创建输出写入器"""
+        config = spider.config
+        return open_writer(config.output_path, config.output_format, config.output_options,
+                           fields=spider.output_fields, name=config.name,
+                           key_of=spider.dedup_index.key_of)
+
+    @staticmethod
+    def consume(spider: BaseSpider, writer: Optional[RecordWriter] = None, mark_seen: bool = True,
+                keep: int = 0) -> Tuple[int, List[Dict]]:
+        """消费爬虫产出的记录
+
+        有写入器时逐条写入，每 SEEN_BATCH_SIZE 条落盘后标记为已见，只保留前 keep 条记录（如用于预览）；
+        没有写入器时保留全部记录。爬取中途出错时写入器仍会关闭，已写入的记录保留在输出文件中。
+
+        Args:
+            spider: 爬虫实例
+            writer: 记录写入器
+            mark_seen: 写入后是否标记为已见
+            keep: 有写入器时保留的记录数
+
+        Returns:
+            (记录数, 保留的记录)
+        """
+        mark_seen = mark_seen and writer is not None and spider.seen_store_enabled
+        results = []
+        pending = []
+        count = 0
         try:
-            output_path = Path(config.output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            if config.output_format == 'json':
-                with open(f"{output_path}.json", 'w', encoding='utf-8') as f:
-                    json.dump(results, f, ensure_ascii=False, indent=2)
-            elif config.output_format == 'csv':
-                import pandas as pd
-                df = pd.DataFrame(results)
-                df.to_csv(f"{output_path}.csv", index=False, encoding='utf-8-sig')
-            elif config.output_format == 'xlsx':
-                import pandas as pd
-                df = pd.DataFrame(results)
-                df.to_excel(f"{output_path}.xlsx", index=False)
-
-            logger.info(f"结果已保存到: {output_path}")
-
-        except Exception as e:
-            logger.error(f"保存结果失败: {e}")
+            for record in spider.iter_crawl():
+                count += 1
+                if writer is None or len(results) < keep:
+                    results.append(record)
+                if writer is None:
+                    continue
+
+                writer.write(record)
+                if mark_seen:
+                    pending.append(record)
+                    if len(pending) >= SEEN_BATCH_SIZE:
+                        writer.flush()
+                        spider.mark_seen(pending)
+                        pending = []
+        finally:
+            # 已落盘的记录即使爬取出错也要标记为已见，避免下次运行重复写入
+            if writer is not None:
+                writer.close()
+                spider.mark_seen(pending)
+
+        return count, results
 
     def get_spider_status(self, config_name: str) -> Optional[Dict]:
         """获取爬虫状态"""
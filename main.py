@@ -7,6 +7,8 @@ SmartSpider 主入口 - 企业级智能爬虫系统
   python main.py --list
   python main.py --create jd_new --type jd
   python main.py --all --concurrent 3
+  python main.py -c configs/jd_iphone16.json --record archive/
+  python main.py -c configs/jd_iphone16.json --replay archive/
 """
 
 import argparse
@@ -39,6 +41,10 @@ def main():
     parser.add_argument('-v', '--verbose', action='store_true', help='详细日志')
     parser.add_argument('--concurrent', type=int, default=3, help='并发数（多项目）')
     parser.add_argument('--check-cookies', action='store_true', help='只检查cookies不爬取')
+    parser.add_argument('--reset-seen', action='store_true', help='清空跨运行去重记录后再爬取')
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument('--record', metavar='DIR', help='将抓取到的页面录制到存档目录')
+    archive_group.add_argument('--replay', metavar='DIR', help='从存档目录重放页面，不启动浏览器、不访问网络')
 
     args = parser.parse_args()
 
@@ -62,7 +68,8 @@ def main():
             return 0
 
         elif args.all:
-            results = manager.run_all_spiders(save_results=True)
+            results = manager.run_all_spiders(save_results=True, reset_seen=args.reset_seen,
+                                              record_dir=args.record, replay_dir=args.replay)
             print(f"运行完成，处理了 {len(results)} 个配置")
             for name, result in results.items():
                 status = "成功" if result['status'] == 'success' else "失败"
@@ -90,25 +97,44 @@ def main():
                         logger.info(f"Cookie: {cookie.name}={cookie.value[:30]}...")
                 return 0
 
-            # 运行爬虫
-            logger.info("开始爬取数据...")
-            results = spider.crawl()
+            # 重置跨运行去重记录
+            if args.reset_seen:
+                spider.reset_seen_store()
+
+            # 录制或重放页面存档
+            if args.replay:
+                spider.open_archive(args.replay, replay=True)
+            elif args.record:
+                spider.open_archive(args.record)
 
-            if results:
-                logger.info(f"爬取完成! 共获取 {len(results)} 条数据")
+            # 运行爬虫，边爬取边保存，重放的数据不计入已见记录
+            logger.info("开始爬取数据...")
+            saver = DataSaver()
+            writer = saver.open_stream(spider.config.name, args.output,
+                                       spider.config.output_format, spider.config.output_options,
+                                       spider.output_fields, spider.dedup_index.key_of)
+            try:
+                count, preview = manager.consume(spider, writer, mark_seen=not args.replay, keep=5)
+            finally:
+                spider.close_archive()
+                spider.close_seen_store()
+
+            if count:
+                logger.info(f"爬取完成! 共获取 {count} 条数据")
+                if spider.stats.as_dict():
+                    logger.info(f"运行统计: {spider.stats.as_dict()}")
 
                 # 检查结果质量
-                if results and len(results[0]) <= 2:  # 如果字段很少，可能是登录失败
+                if len(preview[0]) <= 2:  # 如果字段很少，可能是登录失败
                     logger.warning("获取的字段较少，可能登录未成功")
 
-                # 保存结果
-                saver = DataSaver()
-                output_file = saver.save(results, spider.config.name, args.output)
-                logger.info(f"数据已保存到: {output_file}")
+                logger.info(f"数据已保存到: {writer.path}")
 
                 # 显示预览
-                saver.preview(results)
+                saver.preview(preview, total=count)
             else:
+                if not writer.shared:
+                    writer.path.unlink(missing_ok=True)
                 logger.warning("未获取到任何数据")
                 logger.info("建议: 检查cookie文件是否有效，或增加--check-cookies参数查看cookies")
 
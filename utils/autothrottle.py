@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+自适应限速 - 根据响应延迟与错误率动态调整请求间隔
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from utils.logger import get_logger
+from utils.stats import RunStats
+
+logger = get_logger(__name__)
+
+# 视为服务端限流信号的HTTP状态码
+THROTTLE_STATUSES = (429, 503)
+
+
+def is_login_redirect(requested_url: str, final_url: str) -> bool:
+    """请求是否被重定向到登录/验证页面"""
+    final = (final_url or '').lower()
+    if not final or final == (requested_url or '').lower():
+        return False
+    return 'login' in final or 'passport' in final
+
+
+class AutoThrottle:
+    """自适应请求间隔控制器
+
+    按限速键（主机或配置的域名）分别维护最近 window 次响应的延迟与异常情况：
+    - 出现 429/5xx、登录/验证重定向或请求异常时，间隔加倍；
+    - 否则向 平均延迟/target_concurrency 靠拢，窗口内异常比例超过 max_error_rate 时只增不减。
+    间隔始终限制在 [min_delay, max_delay] 之间。
+    """
+
+    def __init__(self, start_delay: float = 1.0, min_delay: float = 0.0, max_delay: float = 60.0,
+                 target_concurrency: float = 1.0, window: int = 20, max_error_rate: float = 0.1,
+                 stats: RunStats = None):
+        """
+        Args:
+            start_delay: 初始请求间隔(秒)
+            min_delay: 最小请求间隔(秒)
+            max_delay: 最大请求间隔(秒)
+            target_concurrency: 期望同时在途的请求数，间隔目标值为 平均延迟/target_concurrency
+            window: 统计窗口大小（响应数）
+            max_error_rate: 窗口内可容忍的异常比例
+            stats: 运行统计
+        """
+        self.min_delay = max(0.0, min_delay)
+        self.max_delay = max(self.min_delay, max_delay)
+        self.start_delay = self._clamp(start_delay)
+        self.target_concurrency = max(0.1, target_concurrency)
+        self.window = max(1, window)
+        self.max_error_rate = max_error_rate
+        self.stats = stats or RunStats()
+        self._lock = threading.Lock()
+        self._delays: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[Tuple[float, bool]]] = {}
+
+    @classmethod
+    def from_config(cls, config, stats: RunStats = None) -> Optional['AutoThrottle']:
+        """根据爬虫配置创建控制器（autothrottle 配置项），未启用时返回None"""
+        options = getattr(config, 'autothrottle', None)
+        if not options or not options.get('enabled', True):
+            return None
+        return cls(
+            start_delay=options.get('start_delay', config.delay),
+            min_delay=options.get('min_delay', 0.0),
+            max_delay=options.get('max_delay', 60.0),
+            target_concurrency=options.get('target_concurrency', 1.0),
+            window=options.get('window', 20),
+            max_error_rate=options.get('max_error_rate', 0.1),
+            stats=stats,
+        )
+
+    def _clamp(self, delay: float) -> float:
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def delay(self, key: str) -> float:
+        """限速键当前的请求间隔"""
+        with self._lock:
+            return self._delays.get(key, self.start_delay)
+
+    def observe(self, key: str, latency: float, status: Optional[int] = None,
+                blocked: bool = False, error: bool = False) -> float:
+        """记录一次响应并调整请求间隔
+
+        Args:
+            key: 限速键
+            latency: 响应耗时(秒)
+            status: HTTP状态码，浏览器请求为None
+            blocked: 是否被重定向到登录/验证页面
+            error: 请求是否抛出异常（超时、连接错误等）
+
+        Returns:
+            float: 调整后的请求间隔(秒)
+        """
+        bad = error or blocked or (status is not None and (status in THROTTLE_STATUSES or status >= 500))
+
+        with self._lock:
+            old = self._delays.get(key, self.start_delay)
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append((latency, bad))
+
+            if bad:
+                new = self._clamp(max(old * 2, self.min_delay, 0.1))
+                decision = 'backoff'
+            else:
+                ok_latencies = [lat for lat, failed in samples if not failed]
+                latency = sum(ok_latencies) / len(ok_latencies)
+                target = latency / self.target_concurrency
+                error_rate = sum(1 for _, failed in samples if failed) / len(samples)
+                if error_rate > self.max_error_rate:
+                    target = max(target, old)
+                new = self._clamp((old + target) / 2)
+                decision = 'speedup' if new < old else 'slowdown' if new > old else 'hold'
+            self._delays[key] = new
+
+        self.stats.set('autothrottle_delay', round(new, 3))
+        self.stats.incr(f'autothrottle_{decision}')
+        if bad:
+            reason = '请求异常' if error else '登录重定向' if blocked else f"HTTP {status}"
+            logger.warning(f"自适应限速: {key} {reason}，请求间隔 {old:.2f}s -> {new:.2f}s")
+        elif abs(new - old) > 0.1 * old:
+            logger.info(f"自适应限速: {key} 平均延迟 {latency:.2f}s，"
+                        f"请求间隔 {old:.2f}s -> {new:.2f}s")
+        return new
@@ -4,12 +4,18 @@ Cookie加载工具 - 增强版
 """
 
 import json
+import threading
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from utils import json_codec
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 已解析的cookie文件：路径 -> ((修改时间, 大小), cookie列表)，文件变化后重新解析
+_parsed: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}
+_parsed_lock = threading.Lock()
+
 
 class CookieLoader:
     """Cookie加载器"""
@@ -18,7 +24,7 @@ class CookieLoader:
         self.cookie_file = Path(cookie_file)
     
     def load(self) -> List[Dict]:
-        """加载cookie文件
+        """加载cookie文件，同一文件只解析一次，文件修改后重新解析
         
         Returns:
             List[Dict]: 格式化的cookie列表
@@ -26,10 +32,25 @@ class CookieLoader:
         if not self.cookie_file.exists():
             logger.warning(f"Cookie文件不存在: {self.cookie_file}")
             return []
-        
+
+        stat = self.cookie_file.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        path = str(self.cookie_file.resolve())
+        with _parsed_lock:
+            cached = _parsed.get(path)
+        if cached is None or cached[0] != version:
+            cookies = self._parse()
+            with _parsed_lock:
+                _parsed[path] = (version, cookies)
+        else:
+            cookies = cached[1]
+        return [dict(cookie) for cookie in cookies]
+
+    def _parse(self) -> List[Dict]:
+        """解析cookie文件"""
         try:
             with open(self.cookie_file, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
+                cookies = json_codec.load(f)
             
             logger.info(f"加载cookie文件: {self.cookie_file}")
             logger.info(f"原始cookie数量: {len(cookies)}")
@@ -74,6 +95,70 @@ class CookieLoader:
             logger.error(f"加载cookie失败: {e}")
             return []
     
+    @staticmethod
+    def to_cdp(cookies: List[Dict], url: str) -> List[Dict]:
+        """转换为 CDP Network.setCookies 的参数格式，没有域名的cookie归属 url"""
+        params = []
+        for cookie in cookies:
+            param = {
+                'name': cookie['name'],
+                'value': str(cookie['value']),
+                'path': cookie.get('path') or '/',
+                'secure': bool(cookie.get('secure', False)),
+                'httpOnly': bool(cookie.get('httpOnly', False)),
+            }
+            if cookie.get('domain'):
+                param['domain'] = cookie['domain']
+            else:
+                param['url'] = url
+            if cookie.get('expiry'):
+                param['expires'] = float(cookie['expiry'])
+            params.append(param)
+        return params
+
+    def apply_to_driver(self, driver, url: str) -> int:
+        """将cookies注入浏览器，无需先访问页面
+
+        Chromium 驱动通过 CDP Network.setCookies 一次性写入，并用 Network.getCookies 确认 url 可见的数量；
+        其他驱动先访问 url 再逐个添加。
+
+        Args:
+            driver: 浏览器驱动
+            url: 目标页面，没有域名的cookie归属该页面
+
+        Returns:
+            int: 目标页面可见（或添加成功）的cookie数量
+        """
+        cookies = self.load()
+        if not cookies:
+            return 0
+
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': self.to_cdp(cookies, url)})
+            visible = driver.execute_cdp_cmd('Network.getCookies', {'urls': [url]}).get('cookies', [])
+            names = {cookie['name'] for cookie in cookies}
+            count = sum(1 for cookie in visible if cookie.get('name') in names)
+            logger.info(f"通过CDP注入 {len(cookies)} 个cookies，目标页面可见 {count} 个")
+            return count
+        except AttributeError:
+            logger.debug("驱动不支持CDP，访问页面后逐个添加cookies")
+        except Exception as e:
+            logger.warning(f"CDP注入cookies失败，改为逐个添加: {e}")
+
+        driver.get(url)
+        count = 0
+        for cookie in cookies:
+            safe_cookie = {k: v for k, v in cookie.items()
+                           if k in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry') and v != ''}
+            safe_cookie['value'] = str(safe_cookie['value'])
+            try:
+                driver.add_cookie(safe_cookie)
+                count += 1
+            except Exception as e:
+                logger.warning(f"添加cookie失败: {e}")
+        logger.info(f"成功添加 {count} 个cookies")
+        return count
+
     def validate_cookies(self, cookies: List[Dict]) -> bool:
         """验证cookies是否有效
         
@@ -3,15 +3,17 @@
 数据保存工具
 """
 
-import json
-import csv
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Optional
 from utils.logger import get_logger
+from utils.record_writer import OUTPUT_FORMATS, CsvWriter, JsonWriter, RecordWriter, open_writer
 
 logger = get_logger(__name__)
 
+# 自定义文件名中需要去掉的扩展名，写入器按输出格式重新添加
+OUTPUT_EXTENSIONS = {f".{output_format}" for output_format in OUTPUT_FORMATS} | {'.gz', '.zst'}
+
 
 class DataSaver:
     """数据保存器"""
@@ -20,6 +22,49 @@ class DataSaver:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
     
+    @staticmethod
+    def _strip_extension(filename: str) -> Path:
+        """去掉文件名中的输出格式扩展名（含压缩扩展名），保留目录与其余的点号"""
+        path = Path(filename)
+        while path.suffix.lower() in OUTPUT_EXTENSIONS:
+            path = path.with_suffix('')
+        return path
+
+    def open_stream(self, spider_name: str, filename: str = None, output_format: str = 'json',
+                    options: Optional[Dict] = None, fields: Optional[List[str]] = None,
+                    key_of: Optional[Callable[[Dict], str]] = None) -> RecordWriter:
+        """打开流式写入器，逐条写入数据
+
+        json 格式输出 {"data": [...], "meta": {...}}，关闭时写入元信息；
+        其他格式（如 jsonl）按 output_format 与 options 创建对应的写入器。
+
+        Args:
+            spider_name: 爬虫名称
+            filename: 自定义文件名（可选）
+            output_format: 输出格式
+            options: 输出选项（压缩、刷新间隔等）
+            fields: 配置的字段名，用于确定表格类输出的列
+            key_of: 计算记录唯一键的函数（sqlite 格式）
+
+        Returns:
+            RecordWriter: 写入器
+        """
+        if output_format != 'json':
+            stem = self._strip_extension(filename) if filename else \
+                f"{spider_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            return open_writer(str(self.output_dir / stem), output_format, options, fields,
+                               name=spider_name, key_of=key_of)
+
+        if not filename:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"{spider_name}_{timestamp}.json"
+
+        meta = {
+            'spider_name': spider_name,
+            'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        return JsonWriter(str(self.output_dir / filename), meta=meta)
+
     def save(self, data: List[Dict], spider_name: str, filename: str = None) -> str:
         """保存数据
         
@@ -35,48 +80,30 @@ class DataSaver:
             logger.warning("没有数据可保存")
             return ""
         
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{spider_name}_{timestamp}.json"
-        
-        filepath = self.output_dir / filename
-        
-        # 格式化输出
-        output = {
-            'meta': {
-                'spider_name': spider_name,
-                'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'total_count': len(data)
-            },
-            'data': data
-        }
-        
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(output, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"数据已保存到: {filepath}")
-            return str(filepath)
+            with self.open_stream(spider_name, filename) as writer:
+                writer.write_many(data)
+
+            logger.info(f"数据已保存到: {writer.path}")
+            return str(writer.path)
             
         except Exception as e:
             logger.error(f"保存数据失败: {e}")
             return ""
     
-    def save_csv(self, data: List[Dict], spider_name: str, filename: str = None) -> str:
-        """保存为CSV格式
+    def save_csv(self, data: Iterable[Dict], spider_name: str, filename: str = None,
+                 fields: Optional[List[str]] = None) -> str:
+        """保存为CSV格式，逐行写入
         
         Args:
-            data: 要保存的数据
+            data: 要保存的数据，可以是生成器
             spider_name: 爬虫名称
             filename: 自定义文件名（可选）
+            fields: 表头字段（可选），为空时由第一条数据推断，之后出现的新字段追加在末尾
             
         Returns:
             str: 保存的文件路径
         """
-        if not data:
-            logger.warning("没有数据可保存")
-            return ""
-        
         if not filename:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"{spider_name}_{timestamp}.csv"
@@ -84,18 +111,14 @@ class DataSaver:
         filepath = self.output_dir / filename
         
         try:
-            # 获取所有可能的字段
-            all_fields = set()
-            for item in data:
-                all_fields.update(item.keys())
-            
-            fieldnames = sorted(all_fields)
-            
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
-            
+            with CsvWriter(str(filepath), columns=fields) as writer:
+                writer.write_many(data)
+
+            if not writer.count:
+                filepath.unlink(missing_ok=True)
+                logger.warning("没有数据可保存")
+                return ""
+
             logger.info(f"CSV数据已保存到: {filepath}")
             return str(filepath)
             
@@ -103,18 +126,20 @@ class DataSaver:
             logger.error(f"保存CSV失败: {e}")
             return ""
     
-    def preview(self, data: List[Dict], max_items: int = 5):
+    def preview(self, data: List[Dict], max_items: int = 5, total: int = None):
         """预览数据
         
         Args:
             data: 数据列表
             max_items: 显示的最大条数
+            total: 数据总数，流式写入时 data 只包含前几条
         """
         if not data:
             print("📊 没有数据可预览")
             return
         
-        print(f"\n📊 数据预览 (显示前 {min(max_items, len(data))} 条，共 {len(data)} 条):")
+        total = len(data) if total is None else total
+        print(f"\n📊 数据预览 (显示前 {min(max_items, len(data))} 条，共 {total} 条):")
         print("-" * 80)
         
         for i, item in enumerate(data[:max_items], 1):
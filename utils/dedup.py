@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+数据去重工具 - 基于哈希集合的去重索引
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+
+class DedupIndex:
+    """去重索引
+
+    以记录的唯一键摘要作为集合元素，成员判断为 O(1)。
+    未配置 dedup_keys 时沿用原有规则：url -> title -> 整条记录。
+    """
+
+    def __init__(self, keys: Optional[List[str]] = None):
+        self.keys = list(keys) if keys else []
+        self._digests = set()
+
+    @classmethod
+    def from_config(cls, config) -> 'DedupIndex':
+        """根据爬虫配置创建去重索引（读取 list_page.dedup_keys）"""
+        list_page = config.list_page or {}
+        keys = list_page.get('dedup_keys')
+        if isinstance(keys, str):
+            keys = [keys]
+        return cls(keys)
+
+    @staticmethod
+    def _normalize(value) -> str:
+        """规范化键值：去除首尾空白"""
+        if value is None:
+            return ''
+        return str(value).strip()
+
+    def key_of(self, item: Dict) -> str:
+        """计算记录的唯一键"""
+        if self.keys:
+            return '\x1f'.join(self._normalize(item.get(key)) for key in self.keys)
+        return self._normalize(item.get('url') or item.get('title') or str(item))
+
+    def digest(self, item: Dict) -> bytes:
+        """计算记录唯一键的摘要"""
+        return hashlib.blake2b(self.key_of(item).encode('utf-8'), digest_size=16).digest()
+
+    def add(self, item: Dict) -> bool:
+        """加入索引
+
+        Returns:
+            bool: 记录此前未出现过返回True，重复返回False
+        """
+        digest = self.digest(item)
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def filter_new(self, items: Iterable[Dict]) -> List[Dict]:
+        """过滤出未出现过的记录，并将其加入索引"""
+        return [item for item in items if self.add(item)]
+
+    def clear(self):
+        """清空索引"""
+        self._digests.clear()
+
+    def __contains__(self, item: Dict) -> bool:
+        return self.digest(item) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器驱动池 - 在页面之间、爬虫之间复用已启动的浏览器
+"""
+
+import atexit
+import importlib.util
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def make_profile_dir() -> str:
+    """为新启动的浏览器创建独立的临时用户数据目录
+
+    池中空闲的浏览器仍占用其用户数据目录，共用固定目录时启动参数不同的第二个浏览器会启动失败。
+    将返回的目录赋给驱动的 profile_dir 属性，驱动退出时由驱动池删除。
+    """
+    return tempfile.mkdtemp(prefix='smartspider-chrome-')
+
+
+@dataclass
+class _PooledDriver:
+    """池中驱动及其使用情况"""
+    driver: object
+    key: Hashable
+    created_at: float = field(default_factory=time.monotonic)
+    released_at: float = 0.0
+    pages: int = 0
+    leases: int = 0
+    max_pages: int = 0
+    max_rss_mb: float = 0
+    reusable: bool = True
+
+
+class DriverPool:
+    """浏览器驱动池
+
+    按启动参数（key）区分驱动，只有参数相同的爬虫才共用同一个浏览器。
+    借出前检查驱动是否存活；归还时关闭多余标签页、清空cookies和本地存储，
+    访问页数或浏览器进程内存超过上限的驱动直接退出，不再放回池中。
+    空闲驱动超过 max_idle 个或空闲超过 idle_timeout 秒时退出。
+    退出驱动后检查浏览器进程是否全部结束，残留的进程强制结束（需要安装 psutil）。
+    """
+
+    def __init__(self, max_idle: int = 4, idle_timeout: float = 300.0, max_pages: int = 200,
+                 max_rss_mb: float = 1024):
+        """
+        Args:
+            max_idle: 最多保留的空闲驱动数
+            idle_timeout: 空闲驱动保留的秒数
+            max_pages: 默认的回收页数，驱动访问这么多页面后退出，0表示不限
+            max_rss_mb: 默认的回收内存（MB），浏览器进程树常驻内存超过时退出，0表示不限；需要安装 psutil
+        """
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._idle: List[_PooledDriver] = []
+        self._leased: Dict[int, _PooledDriver] = {}
+        self._lock = threading.Lock()
+        self._psutil_missing = False
+        # 累计启动、退出的驱动数和退出后被强制结束的残留进程数
+        self.spawned = 0
+        self.reaped = 0
+        self.orphans_killed = 0
+
+    def acquire(self, key: Hashable, factory: Callable[[], object], max_pages: Optional[int] = None,
+                max_rss_mb: Optional[float] = None, reuse: bool = True):
+        """借出一个驱动，没有可用的空闲驱动时用 factory 新建
+
+        Args:
+            key: 启动参数标识
+            factory: 创建驱动的函数
+            max_pages: 本次借用的回收页数，None表示使用池的默认值
+            max_rss_mb: 本次借用的回收内存（MB），None表示使用池的默认值
+            reuse: 是否复用空闲驱动；为False时总是新建，归还时直接退出
+        """
+        self._reap()
+        entry = None
+        while reuse:
+            with self._lock:
+                entry = next((e for e in reversed(self._idle) if e.key == key), None)
+                if entry is not None:
+                    self._idle.remove(entry)
+            if entry is None:
+                break
+            if self._is_alive(entry.driver):
+                logger.debug(f"复用浏览器驱动（已借出 {entry.leases} 次，访问 {entry.pages} 页）")
+                break
+            logger.warning("空闲浏览器驱动已失效，重新创建")
+            self._quit(entry)
+
+        if entry is None:
+            entry = _PooledDriver(factory(), key, reusable=reuse)
+            with self._lock:
+                self.spawned += 1
+            logger.info("已启动新的浏览器驱动")
+
+        entry.leases += 1
+        entry.max_pages = self.max_pages if max_pages is None else max_pages
+        entry.max_rss_mb = self.max_rss_mb if max_rss_mb is None else max_rss_mb
+        with self._lock:
+            self._leased[id(entry.driver)] = entry
+        return entry.driver
+
+    def count_page(self, driver):
+        """记录驱动访问了一个页面"""
+        entry = self._leased.get(id(driver))
+        if entry is not None:
+            entry.pages += 1
+
+    def should_recycle(self, driver) -> bool:
+        """驱动访问页数或内存是否已超过上限"""
+        entry = self._leased.get(id(driver))
+        return entry is not None and self._exhausted(entry)
+
+    def _exhausted(self, entry: _PooledDriver) -> bool:
+        if entry.max_pages and entry.pages >= entry.max_pages:
+            logger.info(f"浏览器驱动已访问 {entry.pages} 页，回收")
+            return True
+        if entry.max_rss_mb:
+            rss = self.rss_mb(entry.driver)
+            if rss is not None and rss >= entry.max_rss_mb:
+                logger.info(f"浏览器进程内存 {rss:.0f}MB 超过上限 {entry.max_rss_mb}MB，回收")
+                return True
+        return False
+
+    def release(self, driver, discard: bool = False) -> bool:
+        """归还驱动
+
+        Args:
+            driver: acquire 借出的驱动，不是从池中借出的驱动直接退出
+            discard: 直接退出驱动，不放回池中（如驱动出错）
+
+        Returns:
+            bool: 是否放回池中，False表示驱动已退出
+        """
+        with self._lock:
+            entry = self._leased.pop(id(driver), None)
+        if entry is None:
+            self._quit_driver(driver)
+            return False
+
+        if discard or not entry.reusable or self._exhausted(entry) or not self._reset(driver):
+            self._quit(entry)
+            return False
+
+        entry.released_at = time.monotonic()
+        with self._lock:
+            self._idle.append(entry)
+            surplus = self._idle[:-self.max_idle] if self.max_idle > 0 else list(self._idle)
+            del self._idle[:len(surplus)]
+        for old in surplus:
+            self._quit(old)
+        return entry not in surplus
+
+    def _reset(self, driver) -> bool:
+        """清理驱动状态：关闭多余标签页，清空cookies、当前站点的本地存储和资源拦截规则
+
+        Returns:
+            bool: 是否清理成功，失败的驱动不再复用
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            origin = driver.execute_script('return location.origin')
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+                if origin and origin != 'null':
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                                           {'origin': origin, 'storageTypes': 'all'})
+            except Exception:
+                # 非 Chromium 驱动只能清理当前域名
+                driver.delete_all_cookies()
+                driver.execute_script('try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}')
+
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            logger.warning(f"清理浏览器驱动状态失败，退出该驱动: {e}")
+            return False
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        """健康检查：驱动能否执行脚本"""
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _processes(self, driver) -> list:
+        """浏览器进程树（chromedriver 及其子进程），未安装 psutil 或无法获取时返回空列表"""
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+        if process is None or self._psutil_missing:
+            return []
+        try:
+            import psutil
+        except ImportError:
+            logger.warning("统计浏览器进程需要安装 psutil: pip install psutil")
+            self._psutil_missing = True
+            return []
+        try:
+            root = psutil.Process(process.pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def rss_mb(self, driver) -> Optional[float]:
+        """浏览器进程树的常驻内存，单位MB；无法获取时返回None"""
+        processes = self._processes(driver)
+        if not processes:
+            return None
+        import psutil
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+    def _reap(self):
+        """退出空闲过久的驱动"""
+        if self.idle_timeout <= 0:
+            return
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [e for e in self._idle if e.released_at < deadline]
+            self._idle = [e for e in self._idle if e.released_at >= deadline]
+        for entry in expired:
+            self._quit(entry)
+
+    def _quit(self, entry: _PooledDriver):
+        logger.debug(f"退出浏览器驱动（借出 {entry.leases} 次，访问 {entry.pages} 页）")
+        self._quit_driver(entry.driver)
+
+    def _quit_driver(self, driver):
+        """退出驱动，强制结束退出后仍残留的浏览器进程，并删除其临时用户数据目录"""
+        processes = self._processes(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"退出浏览器驱动失败: {e}")
+        with self._lock:
+            self.reaped += 1
+        try:
+            self._kill_orphans(processes)
+        finally:
+            profile_dir = getattr(driver, 'profile_dir', None)
+            if profile_dir:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def _kill_orphans(self, processes: List):
+        """等待浏览器进程退出，超时仍残留的强制结束"""
+        if not processes:
+            return
+
+        import psutil
+        _, alive = psutil.wait_procs(processes, timeout=5)
+        for proc in alive:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+        if alive:
+            with self._lock:
+                self.orphans_killed += len(alive)
+            logger.warning(f"浏览器驱动退出后残留 {len(alive)} 个进程，已强制结束")
+
+    @property
+    def idle_count(self) -> int:
+        """空闲驱动数"""
+        return len(self._idle)
+
+    @property
+    def leased_count(self) -> int:
+        """已借出的驱动数"""
+        return len(self._leased)
+
+    @property
+    def process_audit(self) -> bool:
+        """能否检查浏览器进程：残留进程审计与按内存回收需要安装 psutil"""
+        return not self._psutil_missing and importlib.util.find_spec('psutil') is not None
+
+    def audit(self) -> dict:
+        """驱动生命周期统计：累计启动、退出、强制结束的残留进程数，当前空闲、借出的驱动数，以及是否检查了残留进程"""
+        with self._lock:
+            return {
+                'spawned': self.spawned,
+                'reaped': self.reaped,
+                'orphans_killed': self.orphans_killed,
+                'idle': len(self._idle),
+                'leased': len(self._leased),
+                'process_audit': self.process_audit,
+            }
+
+    def close(self, leased: bool = False):
+        """退出所有空闲驱动
+
+        Args:
+            leased: 同时退出已借出的驱动（进程退出时）
+        """
+        with self._lock:
+            entries, self._idle = self._idle, []
+            if leased:
+                entries += list(self._leased.values())
+                self._leased.clear()
+        for entry in entries:
+            self._quit(entry)
+        if entries:
+            logger.info(f"已关闭 {len(entries)} 个浏览器驱动")
+
+
+_driver_pool: Optional[DriverPool] = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """获取进程内共享的驱动池，进程退出时关闭"""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool()
+            atexit.register(_driver_pool.close, leased=True)
+        return _driver_pool
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+HTML解析工具 - 统一的解析后端
+"""
+
+from typing import List, Union
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.element import Tag
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 默认解析后端，lxml 比纯Python的 html.parser 快数倍
+DEFAULT_BACKEND = 'lxml'
+SUPPORTED_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+
+class HtmlParser:
+    """HTML解析器
+
+    每个页面只解析一次，得到的文档树供列表提取、详情链接提取和下一页判断共用。
+    lxml 不可用或标记严重损坏时，可通过配置 html_parser 切换为 html.parser。
+    """
+
+    def __init__(self, backend: str = None):
+        backend = backend or DEFAULT_BACKEND
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"不支持的HTML解析后端: {backend}")
+        self.backend = backend
+
+    @classmethod
+    def from_config(cls, config) -> 'HtmlParser':
+        """根据爬虫配置创建解析器（读取 html_parser）"""
+        return cls(getattr(config, 'html_parser', None))
+
+    def parse(self, page: Union[str, Tag]) -> Tag:
+        """解析HTML，已解析的文档树原样返回"""
+        if isinstance(page, Tag):
+            return page
+        try:
+            return BeautifulSoup(page or '', self.backend)
+        except FeatureNotFound:
+            logger.warning(f"HTML解析后端 {self.backend} 不可用，改用 html.parser")
+            self.backend = 'html.parser'
+            return BeautifulSoup(page or '', self.backend)
+
+    def parse_fragments(self, fragments: List[str]) -> List[Tag]:
+        """一次性解析多个元素片段（如列表项的 outerHTML），返回各片段的根元素"""
+        if not fragments:
+            return []
+        soup = self.parse(''.join(fragments))
+        root = soup.body or soup
+        return root.find_all(recursive=False)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP缓存 - 基于 ETag/Last-Modified 的条件请求缓存
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from utils import json_codec
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 正文已解码保存，这些头不再适用
+_DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+
+
+@dataclass
+class CachedResponse:
+    """缓存的响应"""
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('etag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('last-modified')
+
+    def validators(self) -> Dict[str, str]:
+        """条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """基于SQLite的HTTP响应缓存
+
+    以 URL+参数 为键保存响应正文与校验信息（ETag/Last-Modified）：
+    - 在 ttl 有效期内直接返回缓存，不发出请求；
+    - 过期后携带 If-None-Match/If-Modified-Since 发出条件请求，304 时复用缓存正文；
+    - 超过 max_entries 条或 max_bytes 字节时按最近访问时间淘汰。
+    """
+
+    def __init__(self, path: str, ttl: float = 0, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite文件路径
+            ttl: 新鲜期(秒)，期内不发请求，0表示每次都做条件请求
+            max_entries: 最多缓存的响应数，0表示不限制
+            max_bytes: 缓存正文总大小上限，0表示不限制
+        """
+        self.path = Path(path)
+        self.ttl = ttl or 0
+        self.max_entries = max_entries or 0
+        self.max_bytes = max_bytes or 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, url TEXT NOT NULL, status INTEGER NOT NULL, headers TEXT NOT NULL, '
+            'body BLOB NOT NULL, size INTEGER NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """缓存键：URL与排序后的参数的摘要"""
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return hashlib.blake2b(f"{url}?{query}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """读取缓存的响应"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body, stored_at = row
+        return CachedResponse(url, status, json_codec.loads(headers), body, stored_at)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """是否仍在新鲜期内"""
+        return self.ttl > 0 and time.time() - entry.stored_at < self.ttl
+
+    @staticmethod
+    def is_cacheable(status: int, headers: Dict[str, str]) -> bool:
+        """响应是否可缓存"""
+        if status != 200:
+            return False
+        return 'no-store' not in headers.get('cache-control', '').lower()
+
+    def store(self, key: str, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """保存响应"""
+        headers = {k.lower(): v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, url, status, headers, body, size, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, url, status, json_codec.dumps(headers), body, len(body), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str, headers: Dict[str, str]):
+        """304 后刷新存储时间与校验信息"""
+        entry = self.get(key)
+        if entry is None:
+            return
+        entry.headers.update({k.lower(): v for k, v in headers.items()
+                              if k.lower() in ('etag', 'last-modified', 'cache-control', 'expires', 'date')})
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET headers = ?, stored_at = ?, accessed_at = ? WHERE key = ?',
+                (json_codec.dumps(entry.headers), now, now, key)
+            )
+            self._conn.commit()
+
+    def touch(self, key: str):
+        """更新最近访问时间"""
+        with self._lock:
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+    def _evict(self):
+        """按最近访问时间淘汰超出上限的响应，调用方需持有锁"""
+        evicted = 0
+        if self.max_entries:
+            cursor = self._conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                'SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            evicted += cursor.rowcount
+        if self.max_bytes:
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall()
+                stale = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((key,))
+                    total -= size
+                self._conn.executemany('DELETE FROM responses WHERE key = ?', stale)
+                evicted += len(stale)
+        if evicted:
+            logger.debug(f"HTTP缓存淘汰 {evicted} 条响应")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
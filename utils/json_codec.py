@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+JSON编解码 - 安装了 orjson 时使用 orjson，否则使用标准库 json
+"""
+
+import json
+from typing import IO, Any, Union
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SUPPORTED_BACKENDS = ('orjson', 'json')
+# 默认后端，orjson 的编解码速度是标准库的数倍（pip install orjson）
+DEFAULT_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+class JsonCodec:
+    """JSON编解码器
+
+    输出与 json.dumps(..., ensure_ascii=False) 一致（不转义中文）。
+    orjson 不支持的值（如超过64位的整数、非字符串的字典键）自动改用标准库编码。
+    解码失败时两种后端都抛出 ValueError 的子类。
+    """
+
+    def __init__(self, backend: str = None):
+        backend = backend or DEFAULT_BACKEND
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"不支持的JSON后端: {backend}")
+        if backend == 'orjson' and orjson is None:
+            raise ImportError("orjson 后端需要安装 orjson: pip install orjson")
+        self.backend = backend
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """解码JSON文本"""
+        if self.backend == 'orjson':
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def load(self, f: IO) -> Any:
+        """从文件对象读取并解码"""
+        return self.loads(f.read())
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        """编码为UTF-8字节串
+
+        Args:
+            obj: 要编码的值
+            indent: 是否以2个空格缩进
+        """
+        if self.backend == 'orjson':
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+            except TypeError:
+                pass
+        return self._stdlib_dumps(obj, indent).encode('utf-8')
+
+    def dumps(self, obj: Any, indent: bool = False) -> str:
+        """编码为字符串"""
+        if self.backend == 'orjson':
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+            except TypeError:
+                pass
+        return self._stdlib_dumps(obj, indent)
+
+    def dump(self, obj: Any, f: IO, indent: bool = False):
+        """编码并写入文本文件对象"""
+        f.write(self.dumps(obj, indent))
+
+    @staticmethod
+    def _stdlib_dumps(obj: Any, indent: bool) -> str:
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2)
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    def response_json(self, response) -> Any:
+        """解码HTTP响应（requests / httpx）的JSON正文
+
+        UTF-8 或未声明编码时直接解码原始字节，避免先转换为字符串；其他编码（如GBK）按响应文本解码。
+        """
+        encoding = (response.encoding or 'utf-8').lower().replace('_', '-')
+        if encoding in ('utf-8', 'utf8'):
+            return self.loads(response.content)
+        return self.loads(response.text)
+
+
+# 默认编解码器
+codec = JsonCodec()
+
+loads = codec.loads
+load = codec.load
+dumps = codec.dumps
+dumps_bytes = codec.dumps_bytes
+dump = codec.dump
+response_json = codec.response_json
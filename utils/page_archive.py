@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+页面存档 - 录制抓取到的页面，离线重放提取
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from utils.http_cache import HttpCache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PageArchive:
+    """基于SQLite的页面存档
+
+    每个爬虫一个存档文件，正文以zlib压缩保存，按 URL+参数 建立索引。
+    录制时按抓取顺序追加，同一URL可有多份快照（如滚动加载过程中的页面）；
+    重放时按URL取最近一份，或按录制顺序遍历某类页面。
+    """
+
+    # 页面类型
+    LIST = 'list'
+    DETAIL = 'detail'
+    JSON = 'json'
+
+    def __init__(self, path: str, readonly: bool = False):
+        """
+        Args:
+            path: SQLite文件路径
+            readonly: 只读打开（重放），文件不存在时抛出 FileNotFoundError
+        """
+        self.path = Path(path)
+        self.readonly = readonly
+        if readonly:
+            if not self.path.exists():
+                raise FileNotFoundError(f"存档不存在: {self.path}")
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS pages ('
+                'seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, url TEXT NOT NULL, '
+                'kind TEXT NOT NULL, body BLOB NOT NULL, size INTEGER NOT NULL, recorded_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS pages_key ON pages (key)')
+            self._conn.commit()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_spider(cls, directory: str, name: str, readonly: bool = False) -> 'PageArchive':
+        """打开存档目录下某个爬虫的存档"""
+        return cls(str(Path(directory) / f"{name}.sqlite"), readonly)
+
+    def put(self, url: str, body: str, kind: str = LIST, params: Optional[Dict] = None):
+        """追加一份页面"""
+        data = (body or '').encode('utf-8')
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO pages (key, url, kind, body, size, recorded_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (HttpCache.make_key(url, params), url, kind, zlib.compress(data, 6), len(data), time.time())
+            )
+            self._conn.commit()
+
+    def get(self, url: str, params: Optional[Dict] = None) -> Optional[str]:
+        """取某个URL最近录制的页面"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body FROM pages WHERE key = ? ORDER BY seq DESC LIMIT 1',
+                (HttpCache.make_key(url, params),)
+            ).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def pages(self, kind: str = LIST) -> Iterator[Tuple[str, str]]:
+        """按录制顺序遍历某类页面
+
+        Yields:
+            (URL, 页面内容)
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT seq FROM pages WHERE kind = ? ORDER BY seq', (kind,)).fetchall()
+        for (seq,) in rows:
+            with self._lock:
+                url, body = self._conn.execute('SELECT url, body FROM pages WHERE seq = ?', (seq,)).fetchone()
+            yield url, zlib.decompress(body).decode('utf-8')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+限速工具 - 进程内按主机共享的令牌桶
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """令牌桶
+
+    以 rate 个/秒的速度补充令牌，最多积累 burst 个。
+    reserve 预占一个令牌并返回需要等待的时间，多个线程按预占顺序排队。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """预占一个令牌
+
+        Returns:
+            float: 取得令牌前需等待的秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def set_rate(self, rate: float, burst: Optional[int] = None):
+        """调整补充速率"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if burst is not None:
+                self.burst = max(1, burst)
+                self._tokens = min(self._tokens, self.burst)
+
+
+class RateLimiter:
+    """按主机限速器
+
+    同一进程内的所有爬虫共享，SpiderManager 并行运行多个访问同一站点的配置时，
+    对该站点的总请求速率不会超过限制。同一主机被不同配置设置了不同速率时取较严格者。
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resolve(url: str, config) -> Tuple[str, float, int]:
+        """根据爬虫配置确定URL所属的限速键与速率
+
+        rate_limit 配置示例::
+
+            {"rate": 0.5, "burst": 1, "domains": {"jd.com": {"rate": 2, "burst": 3}}}
+
+        domains 按域名后缀匹配，匹配到的域名作为限速键，使其子域名共享同一个令牌桶；
+        未配置 rate 时按 1/delay 计算，启用 autothrottle 时按 1/autothrottle.min_delay 计算
+        （请求间隔由自适应限速在 min_delay ~ max_delay 之间调整）。
+
+        Returns:
+            (限速键, 每秒请求数, 突发数)，速率为0表示不限速
+        """
+        host = (urlparse(url).hostname or '').lower()
+        options = getattr(config, 'rate_limit', None) or {}
+        delay = config.delay
+        autothrottle = getattr(config, 'autothrottle', None)
+        if autothrottle and autothrottle.get('enabled', True):
+            delay = autothrottle.get('min_delay', 0.0)
+        default_rate = 1.0 / delay if delay and delay > 0 else 0.0
+        rate = options.get('rate', default_rate)
+        burst = options.get('burst', 1)
+
+        for domain, rule in (options.get('domains') or {}).items():
+            domain = domain.lower().lstrip('.')
+            if host == domain or host.endswith('.' + domain):
+                return domain, rule.get('rate', rate), rule.get('burst', burst)
+        return host, rate, burst
+
+    def bucket(self, key: str, rate: float, burst: int = 1) -> TokenBucket:
+        """获取限速键对应的令牌桶，不存在时创建"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, burst)
+            elif rate > 0 and (bucket.rate <= 0 or rate < bucket.rate):
+                logger.debug(f"主机 {key} 限速收紧为 {rate:.3f} 次/秒")
+                bucket.set_rate(rate, min(burst, bucket.burst))
+            return bucket
+
+    def acquire(self, key: str, rate: float, burst: int = 1) -> float:
+        """阻塞直到取得令牌
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self.bucket(key, rate, burst).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, key: str, rate: float, burst: int = 1) -> float:
+        """acquire 的异步版本"""
+        wait = self.bucket(key, rate, burst).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def reset(self):
+        """清空所有令牌桶"""
+        with self._lock:
+            self._buckets.clear()
+
+
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """获取进程内共享的限速器"""
+    return _rate_limiter
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+流式记录写入 - 边爬取边写入输出文件
+"""
+
+import csv
+import gzip
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from utils import json_codec
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RecordWriter(ABC):
+    """流式记录写入器
+
+    逐条写入记录，内存占用与记录总数无关；关闭时补全文件结构。
+    中途出错时已写入的记录仍保留在文件中。
+    """
+
+    # 输出文件扩展名
+    suffix = ''
+    # 输出文件是否由多次运行共用（不能因本次没有数据而删除）
+    shared = False
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self.closed = False
+
+    @abstractmethod
+    def write(self, record: Dict):
+        """写入一条记录"""
+
+    def write_many(self, records: Iterable[Dict]):
+        """写入多条记录"""
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """将缓冲的数据写入磁盘"""
+
+    @abstractmethod
+    def _finish(self):
+        """补全文件结构并关闭文件"""
+
+    def close(self):
+        """关闭写入器"""
+        if self.closed:
+            return
+        self.closed = True
+        self._finish()
+        logger.info(f"已写入 {self.count} 条数据到: {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class JsonWriter(RecordWriter):
+    """JSON数组写入器，输出与 json.dump(records, indent=2) 的格式相同
+
+    传入 meta 时输出 {"data": [...], "meta": {...}}，meta 中的 total_count 在关闭时填写。
+    """
+
+    suffix = '.json'
+
+    def __init__(self, path: str, meta: Optional[Dict] = None):
+        super().__init__(path)
+        self.meta = meta
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._indent = '  ' if meta is not None else ''
+        self._file.write('{\n  "data": [' if meta is not None else '[')
+
+    def write(self, record: Dict):
+        text = json_codec.dumps(record, indent=True)
+        prefix = self._indent + '  '
+        self._file.write(',\n' if self.count else '\n')
+        self._file.write(prefix + text.replace('\n', '\n' + prefix))
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def _finish(self):
+        if self.count:
+            self._file.write('\n' + self._indent)
+        self._file.write(']')
+        if self.meta is not None:
+            meta = dict(self.meta, total_count=self.count)
+            text = json_codec.dumps(meta, indent=True).replace('\n', '\n  ')
+            self._file.write(f',\n  "meta": {text}\n}}')
+        self._file.write('\n' if self.meta is not None else '')
+        self._file.close()
+
+
+class JsonLinesWriter(RecordWriter):
+    """JSON Lines写入器，每行一条记录，可边写边压缩
+
+    按条数或时间间隔定期刷新到磁盘（压缩时同步刷新压缩块），
+    下游可在爬取过程中用 tail -f / zcat / zstdcat 读取已写入的部分。
+    """
+
+    suffix = '.jsonl'
+    # 压缩方式及对应的扩展名
+    COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+    def __init__(self, path: str, compression: Optional[str] = None, flush_every: int = 100,
+                 flush_interval: float = 5.0):
+        """
+        Args:
+            path: 输出文件路径，压缩时自动追加 .gz / .zst
+            compression: 压缩方式：gzip, zstd，None表示不压缩
+            flush_every: 每写入多少条记录刷新一次，0表示不按条数刷新
+            flush_interval: 距上次刷新超过多少秒时刷新，0表示不按时间刷新
+        """
+        if compression and compression not in self.COMPRESSIONS:
+            raise ValueError(f"不支持的压缩方式: {compression}")
+        if compression and not str(path).endswith(self.COMPRESSIONS[compression]):
+            path = f"{path}{self.COMPRESSIONS[compression]}"
+        super().__init__(path)
+        self.compression = compression
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+
+        self._raw = open(self.path, 'wb')
+        if compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6)
+        elif compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                self._raw.close()
+                raise ImportError("zstd 压缩需要安装 zstandard: pip install zstandard")
+            self._zstd_flush_mode = zstandard.FLUSH_BLOCK
+            self._stream = zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def write(self, record: Dict):
+        self._stream.write(json_codec.dumps_bytes(record) + b'\n')
+        self.count += 1
+        self._unflushed += 1
+        if (self.flush_every and self._unflushed >= self.flush_every) or \
+                (self.flush_interval and time.monotonic() - self._flushed_at >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        if not self._unflushed:
+            return
+        if self.compression == 'zstd':
+            self._stream.flush(self._zstd_flush_mode)
+        elif self.compression == 'gzip':
+            self._stream.flush()
+        self._raw.flush()
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+
+    def _finish(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+
+class CsvWriter(RecordWriter):
+    """CSV写入器，逐行写入，不依赖 pandas
+
+    表头为配置的列表页/详情页字段；未配置字段时以第一条记录的字段为准。
+    之后出现的新字段追加到列末尾，关闭时重写一次文件补全表头和空列。
+    """
+
+    suffix = '.csv'
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None):
+        """
+        Args:
+            path: 输出文件路径
+            columns: 列名，为空时由第一条记录推断
+        """
+        super().__init__(path)
+        self.columns: List[str] = list(dict.fromkeys(columns or []))
+        self._known = set(self.columns)
+        self._header_size = 0
+        self._file = open(self.path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file)
+        if self.columns:
+            self._write_header()
+
+    def _write_header(self):
+        self._writer.writerow(self.columns)
+        self._header_size = len(self.columns)
+
+    def write(self, record: Dict):
+        late = [key for key in record if key not in self._known]
+        if late:
+            self.columns.extend(late)
+            self._known.update(late)
+        if not self._header_size:
+            self._write_header()
+        self._writer.writerow([cell_value(record.get(name)) for name in self.columns])
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def _finish(self):
+        if not self._header_size:
+            self._write_header()
+        self._file.close()
+        if len(self.columns) > self._header_size:
+            self._rewrite()
+
+    def _rewrite(self):
+        """补全表头，较早写入的行补齐空列"""
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        width = len(self.columns)
+        with open(self.path, newline='', encoding='utf-8-sig') as src, \
+                open(tmp, 'w', newline='', encoding='utf-8-sig') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            next(reader, None)
+            writer.writerow(self.columns)
+            for row in reader:
+                writer.writerow(row + [''] * (width - len(row)))
+        os.replace(tmp, self.path)
+        logger.info(f"CSV出现 {width - self._header_size} 个新字段，已重写表头: {self.path}")
+
+
+class TableWriter(RecordWriter):
+    """xlsx写入器，表头需要全部字段，关闭时统一写入"""
+
+    def __init__(self, path: str, output_format: str):
+        super().__init__(path)
+        self.output_format = output_format
+        self.suffix = f".{output_format}"
+        self._records: List[Dict] = []
+
+    def write(self, record: Dict):
+        self._records.append(record)
+        self.count += 1
+
+    def _finish(self):
+        import pandas as pd
+        pd.DataFrame(self._records).to_excel(self.path, index=False)
+        self._records = []
+
+
+def cell_value(value: Any) -> Optional[str]:
+    """将字段值转换为字符串列的取值"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json_codec.dumps(value)
+    return str(value)
+
+
+class ParquetWriter(RecordWriter):
+    """Parquet写入器，每 row_group_size 条记录写入一个行组
+
+    列由配置的列表页/详情页字段确定，均为字符串列；未配置字段时以第一个行组中出现的字段为准。
+    不在列中的字段会被丢弃。内存中最多缓存一个行组。依赖 pyarrow（pip install pyarrow）。
+    """
+
+    suffix = '.parquet'
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None, row_group_size: int = 10000,
+                 compression: str = 'snappy'):
+        """
+        Args:
+            path: 输出文件路径
+            columns: 列名，为空时由第一个行组推断
+            row_group_size: 每个行组的记录数
+            compression: 列压缩方式：snappy, zstd, gzip, none
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("parquet 输出需要安装 pyarrow: pip install pyarrow")
+
+        super().__init__(path)
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.columns = list(columns or [])
+        self.row_group_size = max(1, row_group_size)
+        self.compression = compression
+        self._writer = None
+        self._buffer: List[Dict] = []
+        self._dropped = set()
+
+    def write(self, record: Dict):
+        self._buffer.append(record)
+        self.count += 1
+        if len(self._buffer) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if not self._buffer:
+            return
+        if self._writer is None:
+            if not self.columns:
+                self.columns = list(dict.fromkeys(key for record in self._buffer for key in record))
+            schema = self._pa.schema([(name, self._pa.string()) for name in self.columns])
+            self._writer = self._pq.ParquetWriter(str(self.path), schema, compression=self.compression)
+
+        known = set(self.columns)
+        for record in self._buffer:
+            extra = record.keys() - known - self._dropped
+            if extra:
+                logger.warning(f"字段不在输出列中，已丢弃: {sorted(extra)}")
+                self._dropped.update(extra)
+
+        table = self._pa.table(
+            {name: [cell_value(record.get(name)) for record in self._buffer] for name in self.columns},
+            schema=self._writer.schema,
+        )
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def flush(self):
+        self._write_row_group()
+
+    def _finish(self):
+        self._write_row_group()
+        if self._writer is None:
+            # 没有任何记录时仍写出仅含表结构的文件
+            schema = self._pa.schema([(name, self._pa.string()) for name in self.columns])
+            self._writer = self._pq.ParquetWriter(str(self.path), schema, compression=self.compression)
+        self._writer.close()
+
+
+# 支持的输出格式
+OUTPUT_FORMATS = ('json', 'jsonl', 'parquet', 'sqlite', 'csv', 'xlsx')
+
+
+def open_writer(output_path: str, output_format: str = 'json', options: Optional[Dict] = None,
+                fields: Optional[Sequence[str]] = None, name: str = '',
+                key_of: Optional[Callable[[Dict], str]] = None) -> RecordWriter:
+    """按输出格式创建写入器，输出文件为 output_path 加格式扩展名
+
+    sqlite 格式写入 output_path 所在目录下的 results.sqlite（可由 database 选项指定），
+    多次运行、多个爬虫共用同一个数据库，每个爬虫一张表。
+
+    Args:
+        output_path: 输出路径（不含扩展名）
+        output_format: 输出格式
+        options: 输出选项（output_options 配置项）
+        fields: 配置的字段名，用于确定表格类输出的列
+        name: 爬虫名称，sqlite 输出的默认表名
+        key_of: 计算记录唯一键的函数，sqlite 输出按此键插入或更新
+    """
+    options = options or {}
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"不支持的输出格式: {output_format}")
+    if output_format == 'json':
+        return JsonWriter(f"{output_path}.json")
+    if output_format == 'jsonl':
+        return JsonLinesWriter(
+            f"{output_path}.jsonl",
+            compression=options.get('compression'),
+            flush_every=options.get('flush_every', 100),
+            flush_interval=options.get('flush_interval', 5.0),
+        )
+    if output_format == 'parquet':
+        return ParquetWriter(
+            f"{output_path}.parquet",
+            columns=fields,
+            row_group_size=options.get('row_group_size', 10000),
+            compression=options.get('compression', 'snappy'),
+        )
+    if output_format == 'sqlite':
+        from utils.dedup import DedupIndex
+        from utils.sqlite_writer import SqliteWriter
+
+        key = options.get('key')
+        if key:
+            key_of = DedupIndex([key] if isinstance(key, str) else key).key_of
+        return SqliteWriter(
+            options.get('database') or str(Path(output_path).parent / 'results.sqlite'),
+            table=options.get('table') or name or Path(output_path).name,
+            columns=fields or [],
+            key_of=key_of or DedupIndex().key_of,
+            batch_size=options.get('batch_size', 500),
+        )
+    if output_format == 'csv':
+        return CsvWriter(f"{output_path}.csv", columns=fields)
+    return TableWriter(f"{output_path}.{output_format}", output_format)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+重试策略 - 指数退避、抖动、Retry-After 与重试预算
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple, Type
+
+from utils.logger import get_logger
+from utils.stats import RunStats
+
+logger = get_logger(__name__)
+
+# 默认视为暂时性错误的HTTP状态码
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """重试策略
+
+    HTTP请求与浏览器页面加载共用：异常按类型判断、响应按状态码判断是否重试，
+    等待时间为带抖动的指数退避，服务端给出 Retry-After 时以其为准。
+    每次运行共享一个重试预算，预算耗尽后不再重试。
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 retry_after_max: float = 300.0, budget: int = 100,
+                 retry_statuses: Tuple[int, ...] = RETRY_STATUSES, stats: RunStats = None):
+        """
+        Args:
+            max_retries: 单次请求的最大重试次数
+            backoff_base: 退避基准时间(秒)，第N次重试等待约 base * 2^N 秒
+            backoff_max: 单次退避的最长时间(秒)
+            retry_after_max: 可接受的最长 Retry-After(秒)，超过则放弃重试
+            budget: 本次运行的重试总次数上限，0表示不限制
+            retry_statuses: 需要重试的HTTP状态码
+            stats: 运行统计
+        """
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.budget = budget
+        self.retry_statuses = frozenset(retry_statuses)
+        self.stats = stats or RunStats()
+        self._lock = threading.Lock()
+        self._spent = 0
+
+    @classmethod
+    def from_config(cls, config, stats: RunStats = None) -> 'RetryPolicy':
+        """根据爬虫配置创建重试策略（retry_times 与 retry 配置项）"""
+        options = getattr(config, 'retry', None) or {}
+        return cls(
+            max_retries=config.retry_times,
+            backoff_base=options.get('backoff_base', 1.0),
+            backoff_max=options.get('backoff_max', 60.0),
+            retry_after_max=options.get('retry_after_max', 300.0),
+            budget=options.get('budget', 100),
+            retry_statuses=tuple(options.get('statuses', RETRY_STATUSES)),
+            stats=stats,
+        )
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """解析 Retry-After 头（秒数或HTTP日期）"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的退避时间，取指数退避值的一半到全值之间的随机数"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def _consume_budget(self) -> bool:
+        with self._lock:
+            if self.budget and self._spent >= self.budget:
+                return False
+            self._spent += 1
+            return True
+
+    def retry_delay(self, attempt: int, response=None, error: Exception = None,
+                    retry_on: Tuple[Type[Exception], ...] = ()) -> Optional[float]:
+        """判断是否重试
+
+        Args:
+            attempt: 已重试次数
+            response: 响应对象（需有 status_code 与 headers）
+            error: 请求抛出的异常
+            retry_on: 可重试的异常类型
+
+        Returns:
+            重试前需等待的秒数，不重试时返回None
+        """
+        retry_after = None
+        if error is not None:
+            if not isinstance(error, retry_on):
+                return None
+        else:
+            status = getattr(response, 'status_code', None)
+            if status not in self.retry_statuses:
+                return None
+            retry_after = self.parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None and retry_after > self.retry_after_max:
+                logger.warning(f"Retry-After 为 {retry_after:.0f} 秒，超过上限，放弃重试")
+                self.stats.incr('retry_exhausted')
+                return None
+
+        if attempt >= self.max_retries:
+            self.stats.incr('retry_exhausted')
+            return None
+        if not self._consume_budget():
+            logger.warning("本次运行的重试预算已用完")
+            self.stats.incr('retry_exhausted')
+            return None
+
+        self.stats.incr('retries')
+        delay = self.backoff(attempt)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _describe(self, response, error) -> str:
+        return str(error) if error is not None else f"HTTP {response.status_code}"
+
+    def call(self, func: Callable, description: str = '',
+             retry_on: Tuple[Type[Exception], ...] = ()):
+        """执行并按策略重试，返回最后一次的结果；不可重试或重试用尽时抛出最后一次的异常"""
+        attempt = 0
+        while True:
+            response, error = None, None
+            try:
+                response = func()
+            except Exception as e:
+                error = e
+
+            delay = self.retry_delay(attempt, response, error, retry_on)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            logger.warning(f"{description} 失败({self._describe(response, error)})，"
+                           f"{delay:.1f} 秒后第 {attempt} 次重试")
+            time.sleep(delay)
+
+    async def call_async(self, func: Callable, description: str = '',
+                         retry_on: Tuple[Type[Exception], ...] = ()):
+        """call 的异步版本，func 返回可等待对象"""
+        attempt = 0
+        while True:
+            response, error = None, None
+            try:
+                response = await func()
+            except Exception as e:
+                error = e
+
+            delay = self.retry_delay(attempt, response, error, retry_on)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            logger.warning(f"{description} 失败({self._describe(response, error)})，"
+                           f"{delay:.1f} 秒后第 {attempt} 次重试")
+            await asyncio.sleep(delay)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+已爬取记录存储 - 跨运行去重
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Set
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SeenStore:
+    """基于SQLite的已见记录存储
+
+    只保存记录唯一键的摘要及首次/最近出现时间，数据在磁盘上，内存占用与记录数无关。
+    """
+
+    # 单条SQL中IN参数的数量上限
+    _BATCH_SIZE = 500
+
+    def __init__(self, path: str, ttl: float = 0):
+        """
+        Args:
+            path: SQLite文件路径
+            ttl: 记录有效期(秒)，0表示永不过期
+        """
+        self.path = Path(path)
+        self.ttl = ttl or 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS seen ('
+            'key TEXT PRIMARY KEY, first_seen REAL NOT NULL, last_seen REAL NOT NULL)'
+        )
+        self._conn.commit()
+        self.purge_expired()
+
+    def _cutoff(self) -> float:
+        """过期时间线，早于该时间的记录视为未见过"""
+        return time.time() - self.ttl if self.ttl > 0 else 0
+
+    def purge_expired(self) -> int:
+        """删除过期记录
+
+        Returns:
+            int: 删除的记录数
+        """
+        if self.ttl <= 0:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM seen WHERE last_seen < ?', (self._cutoff(),))
+            self._conn.commit()
+        if cursor.rowcount:
+            logger.info(f"已清理 {cursor.rowcount} 条过期的已见记录")
+        return cursor.rowcount
+
+    def known(self, keys: Iterable[str]) -> Set[str]:
+        """返回给定键中已见过的部分"""
+        keys = list(keys)
+        found = set()
+        cutoff = self._cutoff()
+        with self._lock:
+            for start in range(0, len(keys), self._BATCH_SIZE):
+                batch = keys[start:start + self._BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f'SELECT key FROM seen WHERE last_seen >= ? AND key IN ({placeholders})',
+                    [cutoff, *batch]
+                )
+                found.update(row[0] for row in rows)
+        return found
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self.known([key]))
+
+    def add_many(self, keys: Iterable[str]) -> int:
+        """记录已见键，已存在的键只更新最近出现时间
+
+        Returns:
+            int: 写入的键数量
+        """
+        now = time.time()
+        rows = [(key, now, now) for key in keys]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                'INSERT INTO seen (key, first_seen, last_seen) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET last_seen = excluded.last_seen',
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def reset(path: str) -> bool:
+        """删除已见记录存储
+
+        Returns:
+            bool: 是否删除了文件
+        """
+        removed = False
+        for suffix in ('', '-wal', '-shm'):
+            file = Path(f"{path}{suffix}")
+            if file.exists():
+                file.unlink()
+                removed = True
+        if removed:
+            logger.info(f"已重置已见记录: {path}")
+        return removed
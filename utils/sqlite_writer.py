@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite输出 - 按记录唯一键批量插入或更新
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from utils import json_codec
+from utils.logger import get_logger
+from utils.record_writer import RecordWriter, cell_value
+
+logger = get_logger(__name__)
+
+
+def _quote(name: str) -> str:
+    """SQL标识符转义"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class _WriterThread(threading.Thread):
+    """数据库写线程
+
+    同一个数据库文件只有一个写线程和一个连接，多个爬虫的写入请求排队执行，
+    避免并行运行时争抢写锁。每个请求在一个事务中执行。
+    """
+
+    def __init__(self, path: str):
+        super().__init__(name=f"sqlite-writer-{Path(path).name}", daemon=True)
+        self.path = path
+        self.refs = 0
+        self._queue: queue.Queue = queue.Queue()
+
+    def submit(self, func: Callable[[sqlite3.Connection], object]) -> Future:
+        """提交一个在写线程中执行的操作"""
+        future = Future()
+        self._queue.put((func, future))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                func, future = item
+                try:
+                    with conn:
+                        result = func(conn)
+                    future.set_result(result)
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            conn.close()
+
+
+_threads: Dict[str, _WriterThread] = {}
+_threads_lock = threading.Lock()
+
+
+def _acquire_thread(path: str) -> _WriterThread:
+    """获取数据库对应的写线程，不存在时启动"""
+    key = str(Path(path).resolve())
+    with _threads_lock:
+        thread = _threads.get(key)
+        if thread is None:
+            thread = _threads[key] = _WriterThread(key)
+            thread.start()
+        thread.refs += 1
+        return thread
+
+
+def _release_thread(thread: _WriterThread):
+    """释放写线程，没有写入器使用时停止"""
+    with _threads_lock:
+        thread.refs -= 1
+        if thread.refs > 0:
+            return
+        _threads.pop(thread.path, None)
+    thread.stop()
+
+
+class SqliteWriter(RecordWriter):
+    """SQLite写入器
+
+    每个爬虫一张表，以记录唯一键为主键，每 batch_size 条记录在一个事务中批量插入或更新，
+    并维护 first_seen（首次写入时间）与 last_seen（最近写入时间）。
+    多个写入器写同一个数据库时共用一个写线程；同一写入器最多有一批数据在排队，内存占用有上限。
+    """
+
+    suffix = '.sqlite'
+    shared = True
+
+    def __init__(self, path: str, table: str, columns: Sequence[str], key_of: Callable[[Dict], str],
+                 batch_size: int = 500):
+        """
+        Args:
+            path: 数据库文件路径
+            table: 表名
+            columns: 字段列，记录中其他字段仅保存在 data 列（完整记录的JSON）中
+            key_of: 计算记录唯一键的函数
+            batch_size: 每个事务写入的记录数
+        """
+        super().__init__(path)
+        self.table = table
+        self.columns = [c for c in dict.fromkeys(columns) if c not in ('key', 'data', 'first_seen', 'last_seen')]
+        self.key_of = key_of
+        self.batch_size = max(1, batch_size)
+        self._rows: List[tuple] = []
+        self._pending: Optional[Future] = None
+        self._thread = _acquire_thread(str(self.path))
+        try:
+            self._thread.submit(self._ensure_table).result()
+        except Exception:
+            _release_thread(self._thread)
+            raise
+        self._upsert_sql = self._build_upsert()
+
+    def _ensure_table(self, conn: sqlite3.Connection):
+        """建表，已有的表缺少字段列时补充"""
+        table = _quote(self.table)
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} ('
+            'key TEXT PRIMARY KEY, data TEXT NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL)'
+        )
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for column in self.columns:
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {_quote(column)} TEXT')
+
+    def _build_upsert(self) -> str:
+        names = ['key', *self.columns, 'data', 'first_seen', 'last_seen']
+        updates = [name for name in names if name not in ('key', 'first_seen')]
+        return (
+            f'INSERT INTO {_quote(self.table)} ({", ".join(_quote(n) for n in names)}) '
+            f'VALUES ({", ".join("?" * len(names))}) '
+            f'ON CONFLICT(key) DO UPDATE SET '
+            + ', '.join(f'{_quote(n)} = excluded.{_quote(n)}' for n in updates)
+        )
+
+    def write(self, record: Dict):
+        now = time.time()
+        self._rows.append((
+            self.key_of(record),
+            *(cell_value(record.get(column)) for column in self.columns),
+            json_codec.dumps(record),
+            now,
+            now,
+        ))
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self._submit()
+
+    def _wait(self):
+        """等待上一批写入完成，写入失败时抛出异常"""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def _submit(self):
+        """提交当前批次，不等待其完成"""
+        self._wait()
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        sql = self._upsert_sql
+        self._pending = self._thread.submit(lambda conn: conn.executemany(sql, rows))
+
+    def flush(self):
+        """写入缓冲的记录并等待提交"""
+        self._submit()
+        self._wait()
+
+    def _finish(self):
+        try:
+            self.flush()
+        finally:
+            _release_thread(self._thread)
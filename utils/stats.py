@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+运行统计工具
+"""
+
+import threading
+from typing import Any, Dict
+
+
+class RunStats:
+    """线程安全的运行统计计数器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+
+    def incr(self, key: str, amount: int = 1):
+        """累加计数"""
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, key: str, value: Any):
+        """设置统计值"""
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, key: str, default: Any = 0) -> Any:
+        with self._lock:
+            return self._values.get(key, default)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """返回统计快照"""
+        with self._lock:
+            return dict(self._values)